@@ -1,22 +1,37 @@
-# This script updates the release asset download link in the database (meta) whenever a new release is published. This url is used to download the cities.tsv fixture when a user loads cities in their project.
+# This script updates the release asset download links in the database (meta) whenever a new release is published. These urls are used to download the prebuilt cities database (or the cities.tsv fixture) when a user loads cities in their project.
+# The fixture's sha256 is stored alongside it, loads verify against it and reuse verified cached copies.
 
 import argparse
+import hashlib
 from localis.data import MetaStore
 from localis import CityRegistry
 
 
-def main(repo_url: str, release: str):
-    url = f"{repo_url}/releases/download/{release}/cities.tsv"
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def main(repo_url: str, release: str, tsv: str, cities_db: str):
+    url = f"{repo_url}/releases/download/{release}"
 
     meta = MetaStore()
-    meta.set(CityRegistry.META_URL_KEY, url)
+    meta.set(CityRegistry.META_URL_KEY, f"{url}/cities.tsv")
+    meta.set(CityRegistry.META_SHA256_KEY, sha256_file(tsv))
+    meta.set(CityRegistry.META_DB_URL_KEY, f"{url}/cities.db")
+    meta.set(CityRegistry.META_DB_SHA256_KEY, sha256_file(cities_db))
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("repo_url", type=str)
     parser.add_argument("release", type=str)
+    parser.add_argument("--tsv", type=str, default="data/cities/cities.tsv")
+    parser.add_argument("--db", type=str, default="data/cities/cities.db")
 
     args = parser.parse_args()
 
-    main(args.repo_url, args.release)
+    main(args.repo_url, args.release, args.tsv, args.db)
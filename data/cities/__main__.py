@@ -2,17 +2,55 @@
 # Country and subdivision data are loaded from separate TSV files.
 # Cities are filtered based on feature codes and population. We only want to include actual populated settlements as allCountries.txt contains many other geographical features.
 # allCountries.txt (1.64GB) must be manually downloaded to the src folder from https://download.geonames.org/export/dump/
+# The file is parsed in byte ranges by a pool of worker processes and streamed to cities.tsv, with per-stage timings.
+# With --modifications/--deletes (GeoNames' daily modifications-YYYY-MM-DD.txt/deletes-YYYY-MM-DD.txt), an existing cities.tsv is updated
+# in place instead and the changed rows are written to cities_delta.tsv, which loaded databases apply with localis.cities.apply_delta().
 
 from .scripts.utils import *
 from .scripts.load import load_cities
 from .scripts.dump import dump_to_tsv
+from .scripts.delta import update_cities
+import argparse
+import time
 
 
 def main():
-    countries: dict[str, str] = load_countries()
-    subdivisions: dict[str, str] = load_subdivisions()
-    cities: list[CityDTO] = load_cities(subdivisions, countries)
-    dump_to_tsv(cities)
+    parser = argparse.ArgumentParser("cities")
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=None,
+        help="Parser processes (default: one per cpu, 1 parses in process).",
+    )
+    parser.add_argument(
+        "--modifications",
+        type=Path,
+        default=None,
+        help="Update cities.tsv from a GeoNames modifications file instead of rebuilding it.",
+    )
+    parser.add_argument(
+        "--deletes",
+        type=Path,
+        default=None,
+        help="Update cities.tsv from a GeoNames deletes file instead of rebuilding it.",
+    )
+    args = parser.parse_args()
+
+    with timed("total"):
+        with timed("lookups"):
+            countries: dict[str, str] = load_countries()
+            subdivisions: dict[str, str] = load_subdivisions()
+
+        if args.modifications or args.deletes:
+            with timed("delta"):
+                update_cities(subdivisions, countries, args.modifications, args.deletes)
+            return
+
+        start = time.perf_counter()
+        with timed("parse + write"):
+            count = dump_to_tsv(load_cities(subdivisions, countries, args.workers))
+        print(f"{count / (time.perf_counter() - start):,.0f} cities/s")
 
 
 if __name__ == "__main__":
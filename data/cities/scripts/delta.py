@@ -0,0 +1,123 @@
+from .utils import *
+from .load import HEADERS, is_valid_city, parse_row
+import os
+
+# delta actions, as read by CityModel.apply_delta
+ACTION = "action"
+UPSERT = "upsert"
+DELETE = "delete"
+
+
+def load_modifications(
+    path: Path, subdivisions: dict[str, str], countries: dict[str, str]
+) -> tuple[dict[str, CityDTO], set[str]]:
+    """
+    Parse a GeoNames modifications-YYYY-MM-DD.txt (allCountries.txt rows). Returns the valid cities by
+    geonameid and the geonameids of modified rows that are no longer valid cities.
+    """
+    print(f"Parsing modifications from {path.name}...")
+    cities: dict[str, CityDTO] = {}
+    invalid: set[str] = set()
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for line in f:
+            fields = line.rstrip("\r\n").split("\t")
+            if len(fields) < len(HEADERS):
+                continue
+            if is_valid_city(fields):
+                cities[fields[0]] = parse_row(
+                    dict(zip(HEADERS, fields)), subdivisions, countries
+                )
+            else:
+                invalid.add(fields[0])
+    return cities, invalid
+
+
+def load_deletes(path: Path) -> set[str]:
+    """geonameids of a GeoNames deletes-YYYY-MM-DD.txt (geonameid, name, comment)."""
+    print(f"Parsing deletes from {path.name}...")
+    with open(path, "r", encoding="utf-8") as f:
+        return {line.split("\t", 1)[0] for line in f if line.strip()}
+
+
+def tsv_values(city: CityDTO) -> list[str]:
+    """A city as written (and read back) by csv."""
+    return ["" if v is None else str(v) for v in city.__dict__.values()]
+
+
+def apply_delta(
+    cities: dict[str, CityDTO],
+    removed: set[str],
+    tsv_path: Path = BASE_PATH / "cities.tsv",
+    delta_path: Path = BASE_PATH / "cities_delta.tsv",
+) -> dict[str, int]:
+    """
+    Stream cities.tsv into a new copy with the given cities replaced in place, removed geonameids
+    dropped and new cities appended, then swap it in. The rows that actually changed are written to a
+    delta TSV (cities.tsv columns plus an action) for already loaded databases. Returns the counts.
+    """
+    pending = dict(cities)
+    counts = {"updated": 0, "inserted": 0, "deleted": 0}
+    tmp_path = tsv_path.with_suffix(".tmp")
+
+    with (
+        open(tsv_path, "r", encoding="utf-8", newline="") as src,
+        open(tmp_path, "w", encoding="utf-8", newline="") as out,
+        open(delta_path, "w", encoding="utf-8", newline="") as delta,
+    ):
+        reader = csv.reader(src, delimiter="\t")
+        writer = csv.writer(out, delimiter="\t")
+        delta_writer = csv.writer(delta, delimiter="\t")
+
+        headers = next(reader)
+        key = headers.index("geonames_id")
+        writer.writerow(headers)
+        delta_writer.writerow([ACTION, *headers])
+
+        for row in reader:
+            geonames_id = row[key]
+            if geonames_id in pending:
+                values = tsv_values(pending.pop(geonames_id))
+                writer.writerow(values)
+                if values != row:
+                    delta_writer.writerow([UPSERT, *values])
+                    counts["updated"] += 1
+            elif geonames_id in removed:
+                delete = [""] * len(headers)
+                delete[key] = geonames_id
+                delta_writer.writerow([DELETE, *delete])
+                counts["deleted"] += 1
+            else:
+                writer.writerow(row)
+
+        for city in pending.values():
+            values = tsv_values(city)
+            writer.writerow(values)
+            delta_writer.writerow([UPSERT, *values])
+            counts["inserted"] += 1
+
+    os.replace(tmp_path, tsv_path)
+    print(
+        f"Updated {counts['updated']}, inserted {counts['inserted']} and deleted {counts['deleted']} cities, delta written to {delta_path.name}."
+    )
+    return counts
+
+
+def update_cities(
+    subdivisions: dict[str, str],
+    countries: dict[str, str],
+    modifications: Path | None = None,
+    deletes: Path | None = None,
+) -> dict[str, int]:
+    """Apply GeoNames' daily modification and/or deletion files to cities.tsv."""
+    cities, removed = (
+        load_modifications(modifications, subdivisions, countries)
+        if modifications
+        else ({}, set())
+    )
+    if deletes:
+        deleted = load_deletes(deletes)
+        removed |= deleted
+        for geonames_id in deleted:
+            cities.pop(geonames_id, None)
+
+    return apply_delta(cities, removed)
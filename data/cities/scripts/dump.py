@@ -1,7 +1,11 @@
 from .utils import *
+from collections.abc import Iterable
 
 
-def dump_to_tsv(cities: list[CityDTO]) -> None:
+def dump_to_tsv(
+    cities: Iterable[CityDTO], path: Path = BASE_PATH / "cities.tsv"
+) -> int:
+    """Write cities to the TSV as they arrive, holding none of them. Returns the count."""
     HEADERS = (
         "geonames_id",
         "name",
@@ -14,9 +18,14 @@ def dump_to_tsv(cities: list[CityDTO]) -> None:
         "lng",
     )
 
-    with open(BASE_PATH / "cities.tsv", "w", encoding="utf-8", newline="") as f:
-        print(f"Writing {len(cities)} cities to cities.tsv...")
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        print(f"Writing cities to {path.name}...")
         writer = csv.writer(f, delimiter="\t")
         writer.writerow(HEADERS)
         for city in cities:
             writer.writerow(city.__dict__.values())
+            count += 1
+
+    print(f"Wrote {count} cities to {path.name}.")
+    return count
@@ -1,4 +1,9 @@
 from .utils import *
+from concurrent.futures import ProcessPoolExecutor
+from collections.abc import Iterator
+from itertools import repeat
+import math
+from localis.utils import byte_ranges
 
 HEADERS = [
     "geonameid",
@@ -38,10 +43,15 @@ ALLOWED_FEATURE_CODES = {
 }
 
 
+FEATURE_CODE = HEADERS.index("feature code")
+POPULATION = HEADERS.index("population")
+
+
 def is_valid_city(
-    row: dict[str, str], allowed_codes: set[str] = ALLOWED_FEATURE_CODES
+    fields: list[str], allowed_codes: set[str] = ALLOWED_FEATURE_CODES
 ) -> bool:
-    return row["feature code"] in allowed_codes and row["population"] not in ["", "0"]
+    """Checked on the raw fields of a line, most rows are dropped before building a row dict."""
+    return fields[FEATURE_CODE] in allowed_codes and fields[POPULATION] not in ["", "0"]
 
 
 def filter_names(row: dict[str, str]) -> tuple[str]:
@@ -108,16 +118,65 @@ def parse_row(
     )
 
 
+SOURCE = BASE_PATH / "src/allCountries.txt"
+
+CHUNK_BYTES = 32 << 20
+"""Bytes of allCountries.txt parsed per worker task."""
+
+
+# lookups for the worker processes, set once per worker
+_subdivisions: dict[str, str] = {}
+_countries: dict[str, str] = {}
+
+
+def _init_worker(subdivisions: dict[str, str], countries: dict[str, str]) -> None:
+    global _subdivisions, _countries
+    _subdivisions = subdivisions
+    _countries = countries
+
+
+def parse_range(path: str, start: int, end: int) -> list[CityDTO]:
+    """Parse the valid cities from one byte range of allCountries.txt."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+
+    cities = []
+    for line in text.split("\n"):
+        if not line:
+            continue
+        fields = line.rstrip("\r").split("\t")
+        if not is_valid_city(fields):
+            continue
+        cities.append(parse_row(dict(zip(HEADERS, fields)), _subdivisions, _countries))
+    return cities
+
+
 def load_cities(
-    subdivisions: dict[str, str], countries: dict[str, str]
-) -> list[CityDTO]:
-    with open(BASE_PATH / "src/allCountries.txt", "r", encoding="utf-8") as f:
-        print(f"Parsing cities from allCountries.txt...")
-        rows = csv.DictReader(f, fieldnames=HEADERS, delimiter="\t")
-        cities = []
-        for row in rows:
-            if not is_valid_city(row):
-                continue
-            city = parse_row(row, subdivisions, countries)
-            cities.append(city)
-        return cities
+    subdivisions: dict[str, str],
+    countries: dict[str, str],
+    workers: int | None = None,
+    source: Path = SOURCE,
+) -> Iterator[CityDTO]:
+    """
+    Stream the valid cities of allCountries.txt in file order. The file is split into byte ranges
+    parsed by a pool of worker processes (default: one per cpu), workers=1 parses in process.
+    """
+    with timed("split"):
+        ranges = byte_ranges(source, math.ceil(source.stat().st_size / CHUNK_BYTES))
+    print(f"Parsing cities from {source.name} in {len(ranges)} chunks...")
+
+    if workers == 1:
+        _init_worker(subdivisions, countries)
+        for start, end in ranges:
+            yield from parse_range(str(source), start, end)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(subdivisions, countries),
+    ) as pool:
+        starts, ends = zip(*ranges) if ranges else ((), ())
+        for cities in pool.map(parse_range, repeat(str(source)), starts, ends):
+            yield from cities
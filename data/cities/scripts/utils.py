@@ -1,6 +1,9 @@
 from pathlib import Path
 from dataclasses import dataclass
+from contextlib import contextmanager
+from functools import lru_cache
 import csv
+import time
 import unicodedata
 from unidecode import unidecode
 
@@ -60,14 +63,24 @@ def normalize_name(name: str) -> str:
 ALLOWED_CHARS = set(" -'’")
 
 
-def is_latin(name: str) -> bool:
-    for c in name:
-        if c.isalpha():
-            try:
-                if "LATIN" not in unicodedata.name(c):
-                    return False
-            except ValueError:
-                return False
-        elif c not in ALLOWED_CHARS:
+@lru_cache(maxsize=None)
+def is_latin_char(c: str) -> bool:
+    """Per character script check, memoized: alt names reuse a small alphabet."""
+    if c.isalpha():
+        try:
+            return "LATIN" in unicodedata.name(c)
+        except ValueError:
             return False
-    return True
+    return c in ALLOWED_CHARS
+
+
+def is_latin(name: str) -> bool:
+    return all(map(is_latin_char, name))
+
+
+@contextmanager
+def timed(stage: str):
+    """Print the wall time of a build stage."""
+    start = time.perf_counter()
+    yield
+    print(f"[{stage}] {time.perf_counter() - start:.2f}s")
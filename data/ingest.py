@@ -1,5 +1,13 @@
-from localis.data import db, CountryModel, SubdivisionModel, CityModel, MetaStore
-from localis.utils import clean_row, chunked
+from localis.data import (
+    db,
+    Database,
+    CountryModel,
+    SubdivisionModel,
+    CityModel,
+    MetaStore,
+    LoadMetrics,
+)
+from localis.utils import clean_row
 import csv
 from pathlib import Path
 import zipfile
@@ -8,59 +16,81 @@ import argparse
 DATA_DIR = Path(__file__).parent
 
 
-def ingest_countries() -> None:
-    countries: list[dict] = []
-
+def ingest_countries() -> LoadMetrics:
     with open(DATA_DIR / "countries/countries.tsv", newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f, delimiter="\t")
+        metrics = CountryModel.bulk_load(map(clean_row, reader), defer_merge=True)
 
-        for row in reader:
-            countries.append(clean_row(row))
-
-    with db.atomic():
-        for batch in chunked(list(countries), 100):
-            try:
-                CountryModel.insert_many(batch)
-            except Exception as e:
-                print(f"Unexpected error on batch: {e}")
-                raise e
+    print(f"countries: {metrics}")
+    return metrics
 
 
-def ingest_subdivisions() -> None:
-    subdivisions: list[dict] = []
+def ingest_subdivisions() -> LoadMetrics:
+    def rows(reader: csv.DictReader):
+        for row in reader:
+            row.pop("id")
+            yield clean_row(row)
 
     with open(
         DATA_DIR / "subdivisions/subdivisions.tsv", newline="", encoding="utf-8"
     ) as f:
         reader = csv.DictReader(f, delimiter="\t")
-        for row in reader:
-            row.pop("id")
-            subdivisions.append(clean_row(row))
-
-    with db.atomic():
-        for batch in chunked(list(subdivisions), 100):
-            try:
-                SubdivisionModel.insert_many(batch)
-            except Exception as e:
-                print(f"Unexpected error on batch: {e}")
-                raise e
-
-
-def ingest_cities() -> None:
-    db.create_tables([CityModel])
-    with open(DATA_DIR / "cities/cities.tsv", newline="", encoding="utf-8") as f:
-        CityModel.load(f)
+        metrics = SubdivisionModel.bulk_load(rows(reader), defer_merge=True)
+
+    SubdivisionModel.build_side_tables()
+    print(f"subdivisions: {metrics}")
+    return metrics
+
+
+def ingest_cities(workers: int | None = None) -> LoadMetrics:
+    """Load cities.tsv serially, or with CityModel.load_parallel over workers (> 1) processes."""
+    path = DATA_DIR / "cities/cities.tsv"
+    if workers and workers > 1:
+        metrics = CityModel.load_parallel(path, workers)
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            metrics = CityModel.load(f)
+
+    print(f"cities: {metrics}")
+    return metrics
+
+
+def build_cities_shard(path: str | Path, workers: int | None = None) -> Path:
+    """Build a database holding only the cities tables, published for loads to attach as is."""
+    path = Path(path)
+    path.unlink(missing_ok=True)
+    with db.use(str(path)):
+        ingest_cities(workers)
+        db.vacuum()
+    return path
+
+
+def apply_cities_delta(path: str | Path) -> dict[str, int]:
+    """Apply a cities delta TSV (see data/cities --modifications/--deletes) to the current db in place."""
+    with open(path, newline="", encoding="utf-8") as f:
+        counts = CityModel.apply_delta(f)
+    print(
+        f"Updated {counts['updated']}, inserted {counts['inserted']} and deleted {counts['deleted']} cities."
+    )
+    return counts
 
 
-def compress_db(db_path: str | Path) -> Path:
-    db_path = Path(db_path)
+def compress_db(db_path: str | Path | None = None) -> Path:
+    """Zip the (bundled) database as shipped in wheels, which extract it to the user cache on first use."""
+    db_path = Path(db_path or Database.bundled_path())
     if not db_path.exists():
         raise FileNotFoundError(f"Database file not found: {db_path}")
 
+    archive = DATA_DIR.parent / "src/localis/data" / Database.ARCHIVE
     with zipfile.ZipFile(
-        "src/localis/db/localis_db.zip", "w", compression=zipfile.ZIP_DEFLATED
+        archive, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=9
     ) as zipf:
-        zipf.write(db_path, arcname=db_path.name)
+        zipf.write(db_path, arcname=Database.FILENAME)
+
+    print(
+        f"Compressed {db_path.stat().st_size:,} into {archive.stat().st_size:,} bytes."
+    )
+    return archive
 
 
 def main() -> None:
@@ -68,15 +98,49 @@ def main() -> None:
     parser.add_argument(
         "--full", "-f", action="store_true", help="Ingest cities into the sqlite db."
     )
+    parser.add_argument(
+        "--shard",
+        default=None,
+        help="Only build the prebuilt cities database at this path, leaving the bundled db untouched.",
+    )
+    parser.add_argument(
+        "--delta",
+        default=None,
+        help="Only apply a cities delta TSV to the current db, instead of re-ingesting everything.",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="Only zip the bundled db into the archive shipped in wheels.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes preparing city rows (default: a serial load, usually faster since FTS indexing "
+        "stays on one connection either way).",
+    )
     args = parser.parse_args()
 
+    if args.compress:
+        compress_db()
+        return
+
+    if args.delta:
+        apply_cities_delta(args.delta)
+        return
+
+    if args.shard:
+        build_cities_shard(args.shard, args.workers)
+        return
+
     db.drop_tables([CountryModel, SubdivisionModel, CityModel])
     MetaStore.create_table()
     db.create_tables([CountryModel, SubdivisionModel])
     ingest_countries()
     ingest_subdivisions()
     if args.full:
-        ingest_cities()
+        ingest_cities(args.workers)
 
     db.vacuum()
 
@@ -1,7 +1,7 @@
 from .utils import *
 import re
-from rapidfuzz import fuzz
-
+import numpy as np
+from rapidfuzz import fuzz, process
 
 DIRECTIONAL_TOKENS = {
     "north",
@@ -99,10 +99,84 @@ def threshold(name_a: str, name_b: str) -> int:
     return threshold
 
 
+MIN_THRESHOLD = 70
+
+
+def name_stats(names: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """(lengths, token counts) of names, the inputs of threshold()."""
+    return (
+        np.array([len(n) for n in names], dtype=np.float64),
+        np.array([len(n.split()) for n in names], dtype=np.int64),
+    )
+
+
+def thresholds(stats_a: tuple, stats_b: tuple) -> np.ndarray:
+    """threshold() for every pair of names a x names b (given as name_stats), as a matrix."""
+    len_a, tokens_a = stats_a
+    len_b, tokens_b = stats_b
+    avg_len = (len_a[:, None] + len_b[None, :]) / 2
+
+    matrix = 90 - np.select(
+        [avg_len <= 5, avg_len <= 8, avg_len <= 12], [15, 10, 5], default=0
+    )
+    matrix -= np.where(np.maximum(tokens_a[:, None], tokens_b[None, :]) == 1, 5, 0)
+    return matrix
+
+
+class NameBlock:
+    """
+    The prepared names of the GeoNames subdivisions of one country and admin level, flattened so an
+    ISO subdivision is scored against the whole block with a single cdist call.
+    """
+
+    def __init__(self, subs: list[SubdivisionDTO], names: dict[int, list[str]]):
+        self.subs = subs
+        self.ids = tuple(sub.id for sub in subs)
+        self._names = names
+        self.update()
+
+    def update(self) -> None:
+        """Re-flatten the names, after a subdivision of the block was renamed."""
+        self.names: list[str] = []
+        owners: list[int] = []
+        for i, sub in enumerate(self.subs):
+            if sub.id not in self._names:
+                self._names[sub.id] = prepare_names(sub)
+            self.names += self._names[sub.id]
+            owners += [i] * len(self._names[sub.id])
+        self.owners = np.array(owners, dtype=np.int64)
+        self.stats = name_stats(self.names)
+
+    def match(self, iso_names: list[str]) -> SubdivisionDTO | None:
+        """The first subdivision (in block order) with a name pair above threshold and no directional mismatch."""
+        if not self.names or not iso_names:
+            return None
+
+        scores = process.cdist(
+            iso_names,
+            self.names,
+            scorer=fuzz.token_set_ratio,
+            score_cutoff=MIN_THRESHOLD,
+            dtype=np.float64,
+        )
+        ok = scores >= thresholds(name_stats(iso_names), self.stats)
+        rows, cols = np.nonzero(ok)
+
+        for owner, row, col in sorted(zip(self.owners[cols].tolist(), rows, cols)):
+            if not has_directional_mismatch(iso_names[row], self.names[col]):
+                return self.subs[owner]
+        return None
+
+
 def try_merge(iso_subs: dict[str, SubdivisionDTO], sub_map: SubdivisionMap) -> None:
 
     unmatched_iso_subs: list[SubdivisionDTO] = []
 
+    # prepared names by subdivision id and name blocks by (country, admin level), updated whenever a
+    # merge renames one of their subdivisions
+    names: dict[int, list[str]] = {}
+    blocks: dict[tuple[str, int], NameBlock] = {}
+
     print("Attemping to merge ISO to GeoNames subdivisions...")
     for _, iso_sub in iso_subs.items():
         iso_sub.alt_names = dedupe(iso_sub.alt_names)
@@ -117,21 +191,17 @@ def try_merge(iso_subs: dict[str, SubdivisionDTO], sub_map: SubdivisionMap) -> N
         # extract geonames subdivisions in map by country and admin level
         geo_subs = sub_map.filter(iso_sub.country_alpha2, iso_sub.admin_level)
 
-        iso_names = prepare_names(iso_sub)
-
-        # loop over each cached GeoNames subdivision and attempt to match with the ISO sub.
-        for geo_sub in geo_subs:
-            geo_names = prepare_names(geo_sub)
-
-            if any(
-                fuzz.token_set_ratio(iso_name, geo_name)
-                >= threshold(iso_name, geo_name)
-                and not has_directional_mismatch(iso_name, geo_name)
-                for iso_name in iso_names
-                for geo_name in geo_names
-            ):
-                merge_matched_sub(iso_sub, geo_sub)
-                break
+        key = (iso_sub.country_alpha2, iso_sub.admin_level)
+        block = blocks.get(key)
+        if block is None or block.ids != tuple(sub.id for sub in geo_subs):
+            block = blocks[key] = NameBlock(geo_subs, names)
+
+        # score the ISO sub against every cached GeoNames subdivision at once, first match wins
+        geo_sub = block.match(prepare_names(iso_sub))
+        if geo_sub is not None:
+            merge_matched_sub(iso_sub, geo_sub)
+            names[geo_sub.id] = prepare_names(geo_sub)
+            block.update()
         else:
             unmatched_iso_subs.append(iso_sub)
 
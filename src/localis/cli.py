@@ -4,7 +4,9 @@ import argparse
 
 def loadcities(args):
     """Load the cities dataset"""
-    localis.cities.load(confirmed=args.yes, custom_dir=args.path)
+    localis.cities.load(
+        confirmed=args.yes, custom_dir=args.path, from_file=args.from_file
+    )
 
 
 def unloadcities(args):
@@ -21,6 +23,12 @@ def main():
     )
     loadcities_parser.add_argument("-y", "--yes", action="store_true")
     loadcities_parser.add_argument("-p", "--path", default=None)
+    loadcities_parser.add_argument(
+        "-f",
+        "--from-file",
+        default=None,
+        help="Load cities from a local cities.db or cities.tsv instead of downloading it",
+    )
 
     loadcities_parser.set_defaults(func=loadcities)
 
@@ -1,4 +1,14 @@
-from .database import db, Database
-from .models import CountryModel, SubdivisionModel, CityModel, Model
+from .database import db, Database, LoadMetrics
+from .tracing import QueryTracer
+from .models import (
+    CountryModel,
+    SubdivisionModel,
+    CityModel,
+    Model,
+    CityHierarchy,
+    SubdivisionHierarchy,
+    SubdivisionClosure,
+    CityRTree,
+)
 from ..dtos import DTO, Country, Subdivision, City
 from .meta import MetaStore
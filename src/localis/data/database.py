@@ -1,26 +1,69 @@
 import atexit
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Tuple
 from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import chain
 import sqlite3
-from importlib import resources
+import time
+from importlib import metadata, resources
+import os
 import shutil
+import tempfile
+import zipfile
 from pathlib import Path
+from localis.utils import batched, user_cache_dir
+from localis.data.tracing import QueryTracer
+
+
+@dataclass
+class LoadMetrics:
+    """Rows inserted by a bulk load and the wall time it took."""
+
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.rows:,} rows in {self.seconds:.2f}s ({self.rows_per_second:,.0f} rows/s)"
 
 
 class Database:
     MAX_PREFIX = 24
     PATH = "localis.data"
     FILENAME = "localis.db"
+    ARCHIVE = "localis.db.zip"
+    """Compressed database shipped in wheels instead of FILENAME, extracted to the user cache on first use."""
     CONFIG_FILE = Path.cwd() / ".localis.conf"
+    BULK_BATCH_SIZE = 5000
+    """Rows per executemany in bulk_insert."""
+    BUNDLED_SCHEMA = "bundled"
+    """Schema the bundled database is attached as (read-only) while an external database is in use."""
+
+    _bundled: str | None = None
 
     def __init__(self, db_path: str = None):
         self.db_path: str = db_path or self.get_db_path()
         self._conn: sqlite3.Connection | None = None
+        self._tracer: QueryTracer | None = None
+        self._atomic_depth = 0
+        self._table_columns: dict[str, tuple[str, ...]] = {}
         self._setup_conn()
 
     def _setup_conn(self) -> None:
-        self._conn = sqlite3.connect(self.db_path)
+        bundled = self.bundled_path()
+        is_bundled = self.db_path != ":memory:" and Path(self.db_path) == Path(bundled)
+
+        # an extracted copy of the archive is shared by every project, never written to
+        if is_bundled and not self._package_file().is_file():
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True)
+        else:
+            self._conn = sqlite3.connect(self.db_path)
         self._conn.row_factory = sqlite3.Row
+        self._table_columns = {}
 
         self._conn.execute("PRAGMA synchronous = OFF")
         self._conn.execute("PRAGMA temp_store = MEMORY")
@@ -28,6 +71,10 @@ class Database:
         self._conn.execute("PRAGMA locking_mode = EXCLUSIVE")
         self._conn.execute("PRAGMA mmap_size = 268435456")
 
+        # an external database (e.g. the cities) resolves the bundled tables through an attachment
+        if self.db_path != ":memory:" and not is_bundled:
+            self.attach(bundled, self.BUNDLED_SCHEMA, readonly=True)
+
     def __enter__(self) -> "Database":
         return self
 
@@ -48,12 +95,40 @@ class Database:
 
     @contextmanager
     def atomic(self):
+        """Commit on exit, roll back on an exception. Nested blocks join the outermost one."""
+        self._atomic_depth += 1
         try:
             yield
-            self._conn.commit()
+            if self._atomic_depth == 1:
+                self._conn.commit()
         except Exception:
-            self._conn.rollback()
+            if self._atomic_depth == 1:
+                self._conn.rollback()
             raise
+        finally:
+            self._atomic_depth -= 1
+
+    def attach(self, path: str, schema: str, readonly: bool = False) -> None:
+        """
+        Attach another database file as schema. Unqualified table names resolve to main first, then to
+        attached databases in attach order.
+        """
+        uri = Path(path).resolve().as_uri() + ("?mode=ro" if readonly else "")
+        self.execute(f'ATTACH DATABASE ? AS "{schema}"', (uri,))
+
+    @contextmanager
+    def use(self, path: str):
+        """Temporarily connect to another database file, without touching the config file."""
+        prev_path = self.db_path
+        self.close()
+        self.db_path = path
+        self._setup_conn()
+        try:
+            yield self
+        finally:
+            self.close()
+            self.db_path = prev_path
+            self._setup_conn()
 
     @classmethod
     def copy_to(cls, dir: str = None, filename: str = FILENAME) -> str:
@@ -61,24 +136,53 @@ class Database:
         path = Path(dir) if dir else Path.cwd()
         target_path = path / filename
 
-        db_file = resources.files(cls.PATH) / cls.FILENAME
-        shutil.copy(db_file, target_path)
+        shutil.copy(cls.bundled_path(), target_path)
 
         return str(target_path)
 
+    def enable_tracing(
+        self, dump_path: str | Path | None = None, dump_interval: float = 60.0
+    ) -> QueryTracer:
+        """
+        Record count, total/max time and rows per normalized query shape for everything run through
+        execute and execute_many, available on `db.tracer.stats`. With a dump_path, the stats are
+        also written there as JSON every dump_interval seconds.
+        """
+        self._tracer = QueryTracer(dump_path, dump_interval)
+        return self._tracer
+
+    def disable_tracing(self) -> None:
+        if self._tracer is not None and self._tracer.dump_path:
+            self._tracer.dump()
+        self._tracer = None
+
+    @property
+    def tracer(self) -> QueryTracer | None:
+        return self._tracer
+
     def execute(self, query: str, params: Tuple | Dict = ()) -> sqlite3.Cursor:
         """Execute a single query"""
         cursor = self._conn.cursor()
+        if self._tracer is None:
+            cursor.execute(query, params)
+            return cursor
+
+        start = time.perf_counter()
         cursor.execute(query, params)
-        return cursor
+        return self._tracer.trace(cursor, query, time.perf_counter() - start)
 
     def execute_many(
         self, query: str, params_list: List[Tuple | Dict]
     ) -> sqlite3.Cursor:
         """Execute query with multiple parameter sets"""
         cursor = self._conn.cursor()
+        if self._tracer is None:
+            cursor.executemany(query, params_list)
+            return cursor
+
+        start = time.perf_counter()
         cursor.executemany(query, params_list)
-        return cursor
+        return self._tracer.trace(cursor, query, time.perf_counter() - start)
 
     def insert_many(self, table: str, data_list: List[Dict[str, Any]]) -> None:
         """Insert multiple rows"""
@@ -93,11 +197,66 @@ class Database:
         params_list = [tuple(row[col] for col in column_list) for row in data_list]
         self.execute_many(query, params_list)
 
+    def bulk_insert(
+        self,
+        table: str,
+        rows: Iterable[Dict[str, Any]],
+        batch_size: int = BULK_BATCH_SIZE,
+        progress: Callable[[int], None] | None = None,
+    ) -> LoadMetrics:
+        """
+        Insert any iterable of rows (dicts, columns taken from the first) in batches inside one
+        transaction, holding a single batch in memory. progress, if given, is called with the running
+        row count after every batch.
+        """
+        start = time.perf_counter()
+        metrics = LoadMetrics()
+
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return metrics
+
+        column_list = list(first.keys())
+        columns = ", ".join(column_list)
+        placeholders = ", ".join(["?" for _ in column_list])
+        query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+
+        with self.atomic():
+            for batch in batched(chain([first], rows), batch_size):
+                try:
+                    self.execute_many(
+                        query, [tuple(row[col] for col in column_list) for row in batch]
+                    )
+                except Exception as e:
+                    print(f"Unexpected error on batch: {e}")
+                    raise e
+                metrics.rows += len(batch)
+                if progress:
+                    progress(metrics.rows)
+
+        metrics.seconds = time.perf_counter() - start
+        return metrics
+
     def create_table(self, table_name: str, columns: str) -> None:
         """Create table with given columns definition"""
         query = f"CREATE TABLE IF NOT EXISTS {table_name} ({columns})"
         self.execute(query)
         self._conn.commit()
+        self._table_columns.pop(table_name, None)
+
+    def table_columns(self, table_name: str) -> tuple[str, ...]:
+        """
+        Column names of a table as it exists in the connected database, which may predate columns added
+        to its model. Read once per connection, empty (and not cached) while the table does not exist.
+        """
+        columns = self._table_columns.get(table_name)
+        if columns is None:
+            rows = self.execute(f'PRAGMA table_info("{table_name}")').fetchall()
+            columns = tuple(row["name"] for row in rows)
+            if columns:
+                self._table_columns[table_name] = columns
+        return columns
 
     def create_tables(self, tables: list[object]) -> None:
         for table in tables:
@@ -132,6 +291,7 @@ class Database:
         query = f"""CREATE VIRTUAL TABLE IF NOT EXISTS "{table_name}" USING fts5({columns_str}{options_str})"""
         self.execute(query)
         self._conn.commit()
+        self._table_columns.pop(table_name, None)
 
     def vacuum(self) -> None:
         """Vacuum database"""
@@ -151,8 +311,55 @@ class Database:
         if cls.CONFIG_FILE.exists():
             return cls.CONFIG_FILE.read_text().strip()
 
-        db_file = resources.files(cls.PATH) / cls.FILENAME
-        return str(db_file)
+        return cls.bundled_path()
+
+    @classmethod
+    def bundled_path(cls) -> str:
+        """
+        Path of the database file shipped with the package: the plain file in a source checkout, else
+        the copy of the archive extracted to the user cache (once per release).
+        """
+        if cls._bundled is None:
+            db_file = cls._package_file()
+            if not db_file.is_file():
+                archive = resources.files(cls.PATH) / cls.ARCHIVE
+                db_file = cls.extract(archive, user_cache_dir() / "db")
+            cls._bundled = str(db_file)
+
+        return cls._bundled
+
+    @classmethod
+    def _package_file(cls) -> Path:
+        return Path(str(resources.files(cls.PATH) / cls.FILENAME))
+
+    @classmethod
+    def extract(cls, archive: str | Path, cache_dir: str | Path) -> Path:
+        """
+        Decompress the database in archive into cache_dir/<version>-<crc>/, unless already there.
+        Written to a temporary file and renamed, so concurrent first imports never see a partial file.
+        """
+        try:
+            version = metadata.version("localis")
+        except metadata.PackageNotFoundError:
+            version = "dev"
+
+        with zipfile.ZipFile(archive) as zf:
+            info = zf.getinfo(cls.FILENAME)
+            target = Path(cache_dir) / f"{version}-{info.CRC:08x}" / cls.FILENAME
+            if target.is_file() and target.stat().st_size == info.file_size:
+                return target
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as out, zf.open(info) as src:
+                    shutil.copyfileobj(src, out, 1 << 20)
+                os.replace(tmp, target)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+
+        return target
 
     def revert_to_default(self):
         """Removes config file, external database and reverts to the bundled db file."""
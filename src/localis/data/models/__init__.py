@@ -1,4 +1,12 @@
 from localis.data.models.model import Model
+from localis.data.models.side_table import SideTable
+from localis.data.models.hierarchy import (
+    HierarchyIndex,
+    CityHierarchy,
+    SubdivisionHierarchy,
+    SubdivisionClosure,
+)
+from localis.data.models.rtree import CityRTree
 from localis.data.models.country_model import CountryModel
 from localis.data.models.subdivision_model import SubdivisionModel
 from localis.data.models.city_model import CityModel
@@ -1,8 +1,26 @@
+from localis.data import LoadMetrics
 from localis.data.models.model import Model
-from localis.data.models.fields import CharField, IntField, FloatField, CompoundField
+from localis.data.models.fields import (
+    CharField,
+    IntField,
+    FloatField,
+    CompoundField,
+    GeohashField,
+)
+from localis.data.models.hierarchy import CityHierarchy
+from localis.data.models.rtree import CityRTree
 from localis.dtos import SubdivisionBasic, City
-from localis.utils import clean_row, chunked, pad_num_w_zeros
+from localis.spatial.geohash import encode as encode_geohash
+from localis.utils import clean_row, batched, byte_ranges, pad_num_w_zeros
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
 import csv
+import io
+import os
+import sqlite3
+import tempfile
+import time
 
 
 class CityModel(Model[City]):
@@ -18,6 +36,22 @@ class CityModel(Model[City]):
     population = IntField(index=False)
     lat = FloatField(index=False)
     lng = FloatField(index=False)
+    geohash = GeohashField()
+
+    SIDE_TABLES = (CityHierarchy, CityRTree)
+    """Tables derived from the cities table, rebuilt whenever it is loaded."""
+
+    RANGES_PER_WORKER = 4
+    """Byte ranges (and staging shards) per worker process in load_parallel, for load balancing."""
+    STAGE_SCHEMA = "stage"
+
+    DELTA_BATCH_SIZE = 1000
+    """Delta rows looked up and applied per batch."""
+
+    DELTA_ACTION = "action"
+    """Extra column of a delta TSV: DELTA_UPSERT (a full row) or DELTA_DELETE (geonames_id only)."""
+    DELTA_UPSERT = "upsert"
+    DELTA_DELETE = "delete"
 
     def to_dto(self) -> City:
 
@@ -57,23 +91,141 @@ class CityModel(Model[City]):
         )
 
     @classmethod
-    def load(cls, file):
-        """Loads and entire TSV file into the database."""
+    def in_hierarchy(cls, order_by: str | None = None, **filters) -> list["CityModel"]:
+        """Select cities by country, admin1, admin2 and population via the hierarchy index."""
+        return [cls.from_row(row) for row in CityHierarchy.select(order_by, **filters)]
+
+    @classmethod
+    def load(cls, file, progress: Callable[[int], None] | None = None) -> LoadMetrics:
+        """
+        Stream a TSV file (any text iterable, e.g. an open file or a decoded HTTP stream) into the
+        database in batches, holding one batch in memory at a time. progress, if given, is called with
+        the running row count after every batch. Returns the load metrics, side tables included.
+        """
+        start = time.perf_counter()
         cls.db.create_tables([CityModel])
-        cities: list[dict] = []
         reader = csv.DictReader(file, delimiter="\t")
 
-        for row in reader:
-            row["population"] = pad_num_w_zeros(row["population"])
-            cities.append(clean_row(row))
+        metrics = cls.bulk_load(
+            map(cls._prepare_row, reader), progress=progress, defer_merge=True
+        )
+
+        cls.build_side_tables()
+        metrics.seconds = time.perf_counter() - start
+        return metrics
+
+    @classmethod
+    def load_parallel(
+        cls,
+        path: str | os.PathLike,
+        workers: int | None = None,
+        progress: Callable[[int], None] | None = None,
+    ) -> LoadMetrics:
+        """
+        Load a cities TSV file with parsing and row preparation split by byte range over worker
+        processes (default: one per cpu), each writing its rows to a temporary staging shard. The shards
+        are then attached in file order and copied into the FTS table with INSERT ... SELECT, so ids
+        match a serial load. FTS tokenizing stays on the single writing connection.
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            with open(path, newline="", encoding="utf-8") as f:
+                return cls.load(f, progress)
+
+        start = time.perf_counter()
+        cls.db.create_tables([CityModel])
+
+        with open(path, "rb") as f:
+            header = next(csv.reader([f.readline().decode("utf-8")], delimiter="\t"))
+            body_start = f.tell()
+        ranges = byte_ranges(path, workers * cls.RANGES_PER_WORKER, body_start)
+
+        metrics = LoadMetrics()
+        with tempfile.TemporaryDirectory(prefix="localis-") as tmp:
+            shards = [str(Path(tmp) / f"shard-{i}.db") for i in range(len(ranges))]
+            jobs = [(str(path), header, *r, shard) for r, shard in zip(ranges, shards)]
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                counts = list(pool.map(_stage_range, jobs))
+
+            columns = ", ".join(cls.fields())
+            with cls.deferred_merge():
+                for shard, count in zip(shards, counts):
+                    cls.db.attach(shard, cls.STAGE_SCHEMA, readonly=True)
+                    with cls.db.atomic():
+                        cls.db.execute(
+                            f"INSERT INTO {cls.table_name} ({columns}) SELECT {columns} FROM {cls.STAGE_SCHEMA}.{cls.table_name} ORDER BY rowid"
+                        )
+                    cls.db.execute(f"DETACH DATABASE {cls.STAGE_SCHEMA}")
+                    metrics.rows += count
+                    if progress:
+                        progress(metrics.rows)
+
+        cls.build_side_tables()
+        metrics.seconds = time.perf_counter() - start
+        return metrics
+
+    @classmethod
+    def apply_delta(cls, file) -> dict[str, int]:
+        """
+        Apply a delta TSV (cities.tsv columns plus DELTA_ACTION) keyed by geonames_id: upserts update
+        the matching row in place (keeping its id) or insert it, deletes remove it. Only the affected
+        FTS and side table rows are rewritten. Returns the updated, inserted and deleted counts.
+        """
+        reader = csv.DictReader(file, delimiter="\t")
+        counts = {"updated": 0, "inserted": 0, "deleted": 0}
+        changed: list[int] = []
 
         with cls.db.atomic():
-            for batch in chunked(list(cities), 1000):
-                try:
-                    cls.insert_many(batch)
-                except Exception as e:
-                    print(f"Unexpected error on batch: {e}")
-                    raise e
+            for batch in batched(reader, cls.DELTA_BATCH_SIZE):
+                geonames_ids = [row["geonames_id"] for row in batch]
+                existing = {
+                    model.geonames_id: model.id
+                    for model in cls.get_many("geonames_id", geonames_ids)
+                    if model is not None
+                }
+
+                updates, inserts, deletes = {}, [], []
+                for row in batch:
+                    action = row.pop(cls.DELTA_ACTION)
+                    id = existing.get(row["geonames_id"])
+                    if action == cls.DELTA_DELETE:
+                        if id is not None:
+                            deletes.append(id)
+                    elif action == cls.DELTA_UPSERT:
+                        if id is not None:
+                            updates[id] = cls._prepare_row(row)
+                        else:
+                            inserts.append(cls._prepare_row(row))
+                    else:
+                        raise ValueError(f"Unknown delta action: {action}")
+
+                cls.update_many(updates)
+                cls.delete_many(deletes)
+                if inserts:
+                    start = cls.db.execute(
+                        f"SELECT COALESCE(MAX(rowid), 0) FROM {cls.table_name}"
+                    ).fetchone()[0]
+                    for id, row in enumerate(inserts, start + 1):
+                        row["rowid"] = id
+                    cls.insert_many(inserts)
+                    changed += range(start + 1, start + 1 + len(inserts))
+
+                changed += [*updates, *deletes]
+                counts["updated"] += len(updates)
+                counts["inserted"] += len(inserts)
+                counts["deleted"] += len(deletes)
+
+            cls.refresh_side_tables(changed)
+
+        return counts
+
+    @staticmethod
+    def _prepare_row(row: dict[str, str]) -> dict[str, str | None]:
+        """A cities.tsv row as stored: zero padded population, derived geohash."""
+        row["population"] = pad_num_w_zeros(row["population"])
+        row["geohash"] = encode_geohash(float(row["lat"]), float(row["lng"]))
+        return clean_row(row)
 
     def __init__(
         self,
@@ -86,6 +238,7 @@ class CityModel(Model[City]):
         population: int,
         lat: float,
         lng: float,
+        geohash: str = "",
         **kwargs,
     ):
         self.geonames_id = geonames_id
@@ -97,5 +250,35 @@ class CityModel(Model[City]):
         self.population = population
         self.lat = lat
         self.lng = lng
+        self.geohash = geohash or ""
 
         super().__init__(**kwargs)
+
+
+def _stage_range(job: tuple) -> int:
+    """Worker of CityModel.load_parallel: prepare the rows of one byte range into a staging shard."""
+    path, header, start, end, shard = job
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+
+    reader = csv.DictReader(
+        io.StringIO(text, newline=""), fieldnames=header, delimiter="\t"
+    )
+    columns = list(CityModel.fields())
+    placeholders = ", ".join("?" for _ in columns)
+
+    conn = sqlite3.connect(shard)
+    try:
+        conn.execute(f"CREATE TABLE {CityModel.table_name} ({', '.join(columns)})")
+        cursor = conn.executemany(
+            f"INSERT INTO {CityModel.table_name} VALUES ({placeholders})",
+            (
+                tuple(row.get(col) for col in columns)
+                for row in map(CityModel._prepare_row, reader)
+            ),
+        )
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        conn.close()
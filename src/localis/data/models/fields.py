@@ -23,6 +23,8 @@ class Expression:
 
 class Field(Generic[T], ABC):
     type: Literal["TEXT", "INTEGER", "FLOAT", "BOOLEAN"] = "INTEGER"
+    searchable = True
+    """Whether table-wide full-text queries match against this field."""
 
     def __init__(
         self,
@@ -121,6 +123,36 @@ class CompoundField(Field[str]):
     #     return Expression(f"")
 
 
+class GeohashField(Field[str]):
+    """A single-token geohash, prefix lookups use the FTS prefix indexes."""
+
+    type = "TEXT"
+    searchable = False
+
+    def like(self, pattern: str):
+        prefix = pattern.removesuffix("%")
+        if prefix.isalnum() and pattern == prefix + "%":
+            return self.within([prefix])
+        return super().like(pattern)
+
+    def within(self, cells: list[str]):
+        """Rows inside any of the geohash cells (prefixes)."""
+        # MATCH narrows with prefix index range scans, LIKE keeps true prefix matches only
+        likes = " OR ".join(f"{self.name} LIKE ?" for _ in cells)
+        return Expression(
+            f"{self.name} MATCH ? AND ({likes})",
+            (self._prefix_query(cells), *(f"{cell}%" for cell in cells)),
+        )
+
+    def match_filter(self, cells: list[str]) -> str:
+        """An FTS5 column filter restricting a table-wide MATCH to the geohash cells."""
+        return f"{self.name} : ({self._prefix_query(cells)})"
+
+    @staticmethod
+    def _prefix_query(cells: list[str]) -> str:
+        return " OR ".join(f'"{cell}"*' for cell in cells)
+
+
 class IntField(Field[int]):
     pass
 
@@ -0,0 +1,216 @@
+from localis.data.models.side_table import SideTable
+from localis.utils import chunked
+import sqlite3
+
+
+class HierarchyIndex(SideTable):
+    """
+    A plain (non-FTS) side table mapping the rowids of a model's table onto its place in the
+    country -> admin1 -> admin2 hierarchy.
+
+    FTS5 tables can only be filtered by MATCH, so hierarchy lookups against them are token scans that
+    need re-checking in python. These tables are derived entirely from the source table with
+    INSERT ... SELECT and read back with b-tree index lookups joined on rowid.
+    """
+
+    COLUMNS: dict[str, str] = {}
+    """Column name -> column definition, excluding the rowid (id)."""
+
+    SOURCE_EXPRESSIONS: dict[str, str] = {}
+    """Column name -> SQL expression over the source table used to derive it."""
+
+    INDEXES: list[tuple[str, ...]] = []
+
+    OPERATORS = {"": "=", "gt": ">", "lt": "<"}
+
+    @classmethod
+    def create_table(cls) -> None:
+        columns = ", ".join(f"{name} {sql}" for name, sql in cls.COLUMNS.items())
+        cls.db.execute(
+            f"CREATE TABLE IF NOT EXISTS {cls.table_name}(id INTEGER PRIMARY KEY, {columns})"
+        )
+        for index in cls.INDEXES:
+            cls.db.execute(
+                f"CREATE INDEX IF NOT EXISTS {cls.table_name}_{'_'.join(index)}_idx ON {cls.table_name}({', '.join(index)})"
+            )
+        cls.db.commit()
+
+    @classmethod
+    def build(cls) -> None:
+        """(Re)build the index from the source table."""
+        cls.create_table()
+        columns = ", ".join(cls.SOURCE_EXPRESSIONS.keys())
+        expressions = ", ".join(cls.SOURCE_EXPRESSIONS.values())
+
+        with cls.db.atomic():
+            cls.db.execute(f"DELETE FROM {cls.table_name}")
+            cls.db.execute(
+                f"INSERT INTO {cls.table_name} (id, {columns}) SELECT rowid, {expressions} FROM {cls.source_table}"
+            )
+
+    @classmethod
+    def refresh(cls, ids: list[int]) -> None:
+        """Re-derive the rows of the given source rowids, dropping those no longer in the source table."""
+        cls.ensure()
+        columns = ", ".join(cls.SOURCE_EXPRESSIONS.keys())
+        expressions = ", ".join(cls.SOURCE_EXPRESSIONS.values())
+
+        with cls.db.atomic():
+            for chunk in chunked(list(ids), cls.MAX_PARAMS):
+                placeholders = ", ".join("?" for _ in chunk)
+                cls.db.execute(
+                    f"DELETE FROM {cls.table_name} WHERE id IN ({placeholders})", chunk
+                )
+                cls.db.execute(
+                    f"""INSERT INTO {cls.table_name} (id, {columns})
+                        SELECT rowid, {expressions} FROM {cls.source_table} WHERE rowid IN ({placeholders})""",
+                    chunk,
+                )
+
+    @classmethod
+    def select(cls, order_by: str | None = None, **filters) -> list[sqlite3.Row]:
+        """
+        Fetch the source rows matching the filters, e.g. `select(admin1="...", population__gt=1000)`.
+        Filters set to None are ignored. Supported lookups: exact, __gt, __lt.
+        """
+        cls.ensure()
+
+        conditions = []
+        params = []
+        for key, value in filters.items():
+            if value is None:
+                continue
+            column, _, op = key.partition("__")
+            if column not in cls.COLUMNS or op not in cls.OPERATORS:
+                raise ValueError(f"Unsupported hierarchy filter: {key}")
+            conditions.append(f"h.{column} {cls.OPERATORS[op]} ?")
+            params.append(value)
+
+        q_where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        q_order_by = f"ORDER BY h.{order_by}" if order_by else "ORDER BY h.id"
+
+        return cls.db.execute(
+            f"""SELECT s.rowid as id, s.* FROM {cls.table_name} h
+                JOIN {cls.source_table} s ON s.rowid = h.id
+                {q_where}
+                {q_order_by}""",
+            params,
+        ).fetchall()
+
+
+class CityHierarchy(HierarchyIndex):
+    table_name = "cities_hierarchy"
+    source_table = "cities"
+
+    COLUMNS = {
+        "country": "TEXT NOT NULL",
+        "admin1": "TEXT NOT NULL",
+        "admin2": "TEXT NOT NULL",
+        "population": "INTEGER NOT NULL",
+    }
+
+    SOURCE_EXPRESSIONS = {
+        "country": "COALESCE(country, '')",
+        "admin1": "COALESCE(admin1, '')",
+        "admin2": "COALESCE(admin2, '')",
+        "population": "CAST(COALESCE(population, 0) AS INTEGER)",
+    }
+
+    INDEXES = [
+        ("country", "population"),
+        ("admin1", "population"),
+        ("admin2", "population"),
+    ]
+
+
+class SubdivisionHierarchy(HierarchyIndex):
+    table_name = "subdivisions_hierarchy"
+    source_table = "subdivisions"
+
+    COLUMNS = {
+        "country": "TEXT NOT NULL",
+        "admin_level": "INTEGER NOT NULL",
+        "parent_id": "INTEGER",
+    }
+
+    SOURCE_EXPRESSIONS = {
+        "country": "COALESCE(country, '')",
+        "admin_level": "CASE WHEN COALESCE(parent_id, '') = '' THEN 1 ELSE 2 END",
+        "parent_id": "CAST(NULLIF(parent_id, '') AS INTEGER)",
+    }
+
+    INDEXES = [("country", "admin_level")]
+
+
+class SubdivisionClosure(SideTable):
+    """
+    Closure table of the subdivision tree: one (ancestor_id, descendant_id, depth) row for every
+    ancestor of every subdivision, derived from subdivisions_hierarchy.parent_id with a recursive CTE.
+    Children, descendants and ancestors are then single primary key/index range reads.
+    """
+
+    table_name = "subdivisions_closure"
+    source_table = "subdivisions"
+
+    @classmethod
+    def create_table(cls) -> None:
+        cls.db.execute(f"""CREATE TABLE IF NOT EXISTS {cls.table_name}(
+                    ancestor_id INTEGER NOT NULL,
+                    descendant_id INTEGER NOT NULL,
+                    depth INTEGER NOT NULL,
+                    PRIMARY KEY (ancestor_id, depth, descendant_id)
+                ) WITHOUT ROWID""")
+        cls.db.execute(
+            f"CREATE INDEX IF NOT EXISTS {cls.table_name}_descendant_id_depth_idx ON {cls.table_name}(descendant_id, depth)"
+        )
+        cls.db.commit()
+
+    @classmethod
+    def build(cls) -> None:
+        """(Re)build the closure from the subdivision hierarchy index."""
+        SubdivisionHierarchy.ensure()
+        cls.create_table()
+
+        with cls.db.atomic():
+            cls.db.execute(f"DELETE FROM {cls.table_name}")
+            cls.db.execute(
+                f"""INSERT INTO {cls.table_name} (ancestor_id, descendant_id, depth)
+                    WITH RECURSIVE closure(ancestor_id, descendant_id, depth) AS (
+                        SELECT parent_id, id, 1 FROM {SubdivisionHierarchy.table_name}
+                        WHERE parent_id IS NOT NULL
+                        UNION ALL
+                        SELECT h.parent_id, c.descendant_id, c.depth + 1 FROM closure c
+                        JOIN {SubdivisionHierarchy.table_name} h ON h.id = c.ancestor_id
+                        WHERE h.parent_id IS NOT NULL
+                    )
+                    SELECT ancestor_id, descendant_id, depth FROM closure"""
+            )
+
+    @classmethod
+    def descendants(cls, id: int, depth: int | None = None) -> list[sqlite3.Row]:
+        """Fetch the source rows below a subdivision, nearest first. depth=1 for direct children."""
+        cls.ensure()
+
+        q_depth = "AND c.depth = ?" if depth is not None else ""
+        params = (id, depth) if depth is not None else (id,)
+
+        return cls.db.execute(
+            f"""SELECT s.rowid as id, s.* FROM {cls.table_name} c
+                JOIN {cls.source_table} s ON s.rowid = c.descendant_id
+                WHERE c.ancestor_id = ? {q_depth}
+                ORDER BY c.depth, c.descendant_id""",
+            params,
+        ).fetchall()
+
+    @classmethod
+    def ancestors(cls, id: int) -> list[sqlite3.Row]:
+        """Fetch the source rows above a subdivision, nearest (parent) first."""
+        cls.ensure()
+
+        return cls.db.execute(
+            f"""SELECT s.rowid as id, s.* FROM {cls.table_name} c
+                JOIN {cls.source_table} s ON s.rowid = c.ancestor_id
+                WHERE c.descendant_id = ?
+                ORDER BY c.depth""",
+            (id,),
+        ).fetchall()
@@ -1,13 +1,17 @@
-from localis.data import db, Database
-from localis.data.models.fields import Field, Expression
+from localis.data import db, Database, LoadMetrics
+from localis.data.models.fields import Field, Expression, IntField, FloatField
 from localis.dtos import DTO
-from typing import TypeVar, Generic
+from typing import Callable, Iterable, TypeVar, Generic
 from abc import ABC
 import sqlite3
 from typing import Type
 import json
+import math
+import time
+from array import array
 from abc import abstractmethod
-from localis.utils import prep_fts_tokens
+from contextlib import contextmanager
+from localis.utils import prep_fts_tokens, chunked
 
 TDTO = TypeVar("TDTO", bound=DTO)
 
@@ -20,6 +24,15 @@ class Model(Generic[TDTO], ABC):
     id: int
     rank: float
 
+    MAX_PARAMS = 500
+    """Max number of keys bound per bulk query."""
+
+    FTS_AUTOMERGE = 4
+    """FTS5's default automerge setting, restored after a bulk_load with defer_merge."""
+
+    SIDE_TABLES: tuple = ()
+    """SideTables derived from this model's table, created, dropped and rebuilt alongside it."""
+
     def __init__(self, id: int, rank: float | None = None, **kwargs):
         self.id = id
         self.rank = rank
@@ -37,8 +50,21 @@ class Model(Generic[TDTO], ABC):
     @classmethod
     def create_table(cls) -> None:
         cls._create_fts()
+        for table in cls.SIDE_TABLES:
+            table.create_table()
         cls.db.commit()
 
+    @classmethod
+    def build_side_tables(cls) -> None:
+        for table in cls.SIDE_TABLES:
+            table.build()
+
+    @classmethod
+    def refresh_side_tables(cls, ids: list[int]) -> None:
+        """Re-derive the side table rows of the given (changed or deleted) rowids."""
+        for table in cls.SIDE_TABLES:
+            table.refresh(ids)
+
     @classmethod
     def count(cls) -> int:
         return cls.db.execute(f"SELECT COUNT(*) FROM {cls.table_name}").fetchone()[0]
@@ -51,12 +77,64 @@ class Model(Generic[TDTO], ABC):
                     name = f"{name} UNINDEXED"
                 yield name
 
+    @classmethod
+    def fields(cls) -> dict[str, Field]:
+        return {
+            name: attr for name, attr in cls.__dict__.items() if isinstance(attr, Field)
+        }
+
+    @classmethod
+    def to_columns(
+        cls, fields: list[str] | None = None, chunk_size: int = 10000
+    ) -> dict[str, array | list]:
+        """
+        Stream the table in id order into one buffer per field without building models: array('q') for
+        ints (missing values are 0), array('d') for floats (missing values are NaN) and lists for text.
+        """
+        model_fields = cls.fields()
+        fields = list(fields) if fields else ["id", *model_fields]
+
+        unknown = [f for f in fields if f != "id" and f not in model_fields]
+        if unknown:
+            raise ValueError(f"Unknown {cls.table_name} fields: {unknown}")
+
+        columns: dict[str, array | list] = {}
+        converters = []
+        for name in fields:
+            field = model_fields.get(name)
+            if name == "id" or isinstance(field, IntField):
+                columns[name] = array("q")
+                converters.append(lambda v: int(v) if v not in (None, "") else 0)
+            elif isinstance(field, FloatField):
+                columns[name] = array("d")
+                converters.append(
+                    lambda v: float(v) if v not in (None, "") else math.nan
+                )
+            else:
+                columns[name] = []
+                converters.append(None)
+
+        select = ", ".join("rowid" if f == "id" else f for f in fields)
+        cursor = cls.db.execute(f"SELECT {select} FROM {cls.table_name} ORDER BY rowid")
+        cursor.row_factory = None  # plain tuples
+
+        buffers = list(zip(columns.values(), converters))
+        while rows := cursor.fetchmany(chunk_size):
+            for i, (buffer, convert) in enumerate(buffers):
+                values = (row[i] for row in rows)
+                buffer.extend(map(convert, values) if convert else values)
+        cursor.close()
+
+        return columns
+
     @classmethod
     def _create_fts(cls) -> None:
         cls.db.create_fts_table(cls.table_name, cls.columns())
 
     @classmethod
     def drop(cls):
+        for table in cls.SIDE_TABLES:
+            table.drop()
         cls.db.execute(f"DROP TABLE IF EXISTS {cls.table_name}")
         cls.db.commit()
         cls.db.vacuum()
@@ -66,6 +144,67 @@ class Model(Generic[TDTO], ABC):
         """Insert multiple rows into the database, requires with atomic."""
         cls.db.insert_many(cls.table_name, data)
 
+    @classmethod
+    def bulk_load(
+        cls,
+        rows: Iterable[dict],
+        batch_size: int = Database.BULK_BATCH_SIZE,
+        progress: Callable[[int], None] | None = None,
+        defer_merge: bool = False,
+    ) -> LoadMetrics:
+        """
+        Stream rows into the table with Database.bulk_insert. With defer_merge, FTS5 automatic segment
+        merging is switched off during the load and the index is merged once (optimize) at the end,
+        which suits tables built once and read many times.
+        """
+        if not defer_merge:
+            return cls.db.bulk_insert(cls.table_name, rows, batch_size, progress)
+
+        start = time.perf_counter()
+        with cls.deferred_merge():
+            metrics = cls.db.bulk_insert(cls.table_name, rows, batch_size, progress)
+        metrics.seconds = time.perf_counter() - start
+        return metrics
+
+    @classmethod
+    @contextmanager
+    def deferred_merge(cls):
+        """Switch FTS5 automatic segment merging off for a bulk write, then restore it and merge the index once."""
+        table = cls.table_name
+        cls.db.execute(f"INSERT INTO {table}({table}, rank) VALUES('automerge', 0)")
+        cls.db.commit()
+        try:
+            yield
+        finally:
+            cls.db.execute(
+                f"INSERT INTO {table}({table}, rank) VALUES('automerge', ?)",
+                (cls.FTS_AUTOMERGE,),
+            )
+            cls.db.commit()
+
+        cls.db.execute(f"INSERT INTO {table}({table}) VALUES('optimize')")
+        cls.db.commit()
+
+    @classmethod
+    def update_many(cls, data: dict[int, dict]) -> None:
+        """Update rows by rowid, requires with atomic. FTS5 re-indexes the updated rows only."""
+        if not data:
+            return
+
+        column_list = list(next(iter(data.values())).keys())
+        assignments = ", ".join(f"{col} = ?" for col in column_list)
+        cls.db.execute_many(
+            f"UPDATE {cls.table_name} SET {assignments} WHERE rowid = ?",
+            [(*(row[col] for col in column_list), id) for id, row in data.items()],
+        )
+
+    @classmethod
+    def delete_many(cls, ids: list[int]) -> None:
+        """Delete rows by rowid, requires with atomic."""
+        cls.db.execute_many(
+            f"DELETE FROM {cls.table_name} WHERE rowid = ?", [(id,) for id in ids]
+        )
+
     def __str__(self):
         return json.dumps(self.__dict__, indent=4)
 
@@ -88,6 +227,44 @@ class Model(Generic[TDTO], ABC):
             return None
         return cls.from_row(row)
 
+    @classmethod
+    def get_many(cls, field: str, values: list) -> list["Model | None"]:
+        """
+        Fetch many rows by a single field, one query per chunk of MAX_PARAMS unique keys.
+        Returns models in input order, None for misses. Repeated keys share the same model.
+        """
+        if field == "id":
+            normalize = int
+        else:
+            normalize = str
+
+        keys = list(dict.fromkeys(normalize(v) for v in values if v not in (None, "")))
+        found: dict = {}
+
+        for chunk in chunked(keys, cls.MAX_PARAMS):
+            placeholders = ", ".join("?" for _ in chunk)
+            if field == "id":
+                q_where = f"rowid IN ({placeholders})"
+                params = chunk
+            else:
+                # MATCH narrows to the indexed candidates, IN keeps exact matches only
+                phrases = " OR ".join(
+                    '"{}"'.format(k.replace('"', '""')) for k in chunk
+                )
+                q_where = f"{field} MATCH ? AND {field} IN ({placeholders})"
+                params = [phrases, *chunk]
+
+            rows = cls.db.execute(
+                f"SELECT rowid as id, * FROM {cls.table_name} WHERE {q_where}", params
+            ).fetchall()
+            for row in rows:
+                model = cls.from_row(row)
+                found.setdefault(normalize(getattr(model, field)), model)
+
+        return [
+            found.get(normalize(v)) if v not in (None, "") else None for v in values
+        ]
+
     @classmethod
     def select(
         cls,
@@ -119,7 +296,12 @@ class Model(Generic[TDTO], ABC):
         order_by: list[str] = [],
         limit: int = None,
         offset: int = None,
+        match_filter: str | None = None,
     ):
+        """
+        Full-text match over the whole table (query) or per column (field_queries).
+        match_filter is an extra FTS5 expression ANDed to a table-wide query, e.g. a column filter.
+        """
         if field_queries:
             params = list(
                 prep_fts_tokens(q, exact_match) for q in field_queries.values()
@@ -130,6 +312,16 @@ class Model(Generic[TDTO], ABC):
         elif query:
             sanitized_input = prep_fts_tokens(query, exact_match)
 
+            # a table loaded by an older version may lack newer columns
+            live = cls.db.table_columns(cls.table_name)
+            excluded = [
+                n for n, f in cls.fields().items() if not f.searchable and n in live
+            ]
+            if excluded:
+                sanitized_input = f"- {{{' '.join(excluded)}}} : ({sanitized_input})"
+            if match_filter:
+                sanitized_input = f"({sanitized_input}) AND {match_filter}"
+
             params = [sanitized_input]
             q_where = f"WHERE {cls.table_name} MATCH ?"
         else:
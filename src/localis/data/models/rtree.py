@@ -0,0 +1,81 @@
+from localis.data.models.side_table import SideTable
+from localis.utils import chunked
+import sqlite3
+
+
+class CityRTree(SideTable):
+    """
+    SQLite R*Tree over city coordinates, one degenerate (point) box per city rowid.
+
+    R*Tree coordinates are stored as 32-bit floats and rounded outwards, so box queries can return
+    points marginally outside the box. Callers re-check against the exact lat/lng.
+    """
+
+    table_name = "cities_rtree"
+    source_table = "cities"
+
+    @classmethod
+    def create_table(cls) -> None:
+        cls.db.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {cls.table_name} USING rtree(id, min_lat, max_lat, min_lng, max_lng)"
+        )
+        cls.db.commit()
+
+    @classmethod
+    def build(cls) -> None:
+        cls.create_table()
+
+        with cls.db.atomic():
+            cls.db.execute(f"DELETE FROM {cls.table_name}")
+            cls.db.execute(
+                f"""INSERT INTO {cls.table_name} (id, min_lat, max_lat, min_lng, max_lng)
+                    SELECT rowid, CAST(lat AS REAL), CAST(lat AS REAL), CAST(lng AS REAL), CAST(lng AS REAL)
+                    FROM {cls.source_table}
+                    WHERE lat IS NOT NULL AND lng IS NOT NULL"""
+            )
+
+    @classmethod
+    def refresh(cls, ids: list[int]) -> None:
+        """Re-derive the boxes of the given source rowids, dropping those no longer in the source table."""
+        cls.ensure()
+
+        with cls.db.atomic():
+            for chunk in chunked(list(ids), cls.MAX_PARAMS):
+                placeholders = ", ".join("?" for _ in chunk)
+                cls.db.execute(
+                    f"DELETE FROM {cls.table_name} WHERE id IN ({placeholders})", chunk
+                )
+                cls.db.execute(
+                    f"""INSERT INTO {cls.table_name} (id, min_lat, max_lat, min_lng, max_lng)
+                        SELECT rowid, CAST(lat AS REAL), CAST(lat AS REAL), CAST(lng AS REAL), CAST(lng AS REAL)
+                        FROM {cls.source_table}
+                        WHERE rowid IN ({placeholders}) AND lat IS NOT NULL AND lng IS NOT NULL""",
+                    chunk,
+                )
+
+    @classmethod
+    def select(
+        cls, min_lat: float, min_lng: float, max_lat: float, max_lng: float
+    ) -> list[sqlite3.Row]:
+        """
+        Fetch (id, lat, lng, population) for the points in a box. Boxes crossing the antimeridian
+        (min_lng > max_lng) are split in two.
+        """
+        cls.ensure()
+
+        if min_lng > max_lng:
+            boxes = [(min_lng, 180.0), (-180.0, max_lng)]
+        else:
+            boxes = [(min_lng, max_lng)]
+
+        rows = []
+        for west, east in boxes:
+            rows += cls.db.execute(
+                f"""SELECT r.id, CAST(s.lat AS REAL) as lat, CAST(s.lng AS REAL) as lng,
+                        CAST(s.population AS INTEGER) as population
+                    FROM {cls.table_name} r
+                    JOIN {cls.source_table} s ON s.rowid = r.id
+                    WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lng >= ? AND r.min_lng <= ?""",
+                (min_lat, max_lat, west, east),
+            ).fetchall()
+        return rows
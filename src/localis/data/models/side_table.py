@@ -0,0 +1,50 @@
+from localis.data import db, Database
+from abc import ABC, abstractmethod
+
+
+class SideTable(ABC):
+    """
+    A plain table (or non-FTS virtual table) derived from a model's FTS table and keyed by its rowids.
+    Side tables are rebuilt from the source table, never written to directly.
+    """
+
+    db: Database = db
+    table_name = ""
+    source_table = ""
+
+    MAX_PARAMS = 500
+    """Max number of rowids bound per query."""
+
+    @classmethod
+    @abstractmethod
+    def create_table(cls) -> None: ...
+
+    @classmethod
+    @abstractmethod
+    def build(cls) -> None:
+        """(Re)build the table from the source table."""
+
+    @classmethod
+    def refresh(cls, ids: list[int]) -> None:
+        """Re-derive the rows of the given source rowids (changed or deleted). Rebuilds everything unless overridden."""
+        cls.build()
+
+    @classmethod
+    def drop(cls) -> None:
+        cls.db.execute(f"DROP TABLE IF EXISTS {cls.table_name}")
+        cls.db.commit()
+
+    @classmethod
+    def exists(cls) -> bool:
+        """Whether the table exists in the main or any attached database."""
+        row = cls.db.execute(
+            "SELECT 1 FROM pragma_table_list WHERE name = ?",
+            (cls.table_name,),
+        ).fetchone()
+        return row is not None
+
+    @classmethod
+    def ensure(cls) -> None:
+        """Build the table if missing, e.g. for databases loaded before it existed."""
+        if not cls.exists():
+            cls.build()
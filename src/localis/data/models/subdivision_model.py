@@ -1,5 +1,6 @@
 from localis.data.models.model import Model
 from localis.data.models.fields import CharField, CompoundField
+from localis.data.models.hierarchy import SubdivisionHierarchy, SubdivisionClosure
 from localis.dtos import Subdivision
 
 
@@ -15,6 +16,30 @@ class SubdivisionModel(Model[Subdivision]):
     country = CompoundField()
     parent_id = CharField()
 
+    SIDE_TABLES = (SubdivisionHierarchy, SubdivisionClosure)
+
+    @classmethod
+    def in_hierarchy(
+        cls, order_by: str | None = None, **filters
+    ) -> list["SubdivisionModel"]:
+        """Select subdivisions by country and admin level via the hierarchy index."""
+        return [
+            cls.from_row(row)
+            for row in SubdivisionHierarchy.select(order_by, **filters)
+        ]
+
+    @classmethod
+    def descendants_of(
+        cls, id: int, depth: int | None = None
+    ) -> list["SubdivisionModel"]:
+        """Select the subdivisions below a subdivision via the closure table."""
+        return [cls.from_row(row) for row in SubdivisionClosure.descendants(id, depth)]
+
+    @classmethod
+    def ancestors_of(cls, id: int) -> list["SubdivisionModel"]:
+        """Select the subdivisions above a subdivision via the closure table."""
+        return [cls.from_row(row) for row in SubdivisionClosure.ancestors(id)]
+
     def to_dto(self):
         self.alt_names = self.alt_names.split("|") if self.alt_names else []
         self.parent_id = int(self.parent_id) if self.parent_id else None
@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+import json
+import os
+import re
+import sqlite3
+import time
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PARAM_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql: str) -> str:
+    """
+    The shape of a query: literals replaced by ?, placeholder lists collapsed and whitespace squeezed,
+    so e.g. `rowid IN (1, 2, 3) LIMIT 10` and `rowid IN (?, ?) LIMIT 5` share one shape.
+    """
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PARAM_LIST.sub("?, ...", sql)
+    return " ".join(sql.split())
+
+
+@dataclass
+class QueryStats:
+    """Calls, wall time (execute plus fetches) and rows of one query shape."""
+
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    rows: int = 0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "avg_ms": round(self.total_seconds * 1000 / self.count, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "rows": self.rows,
+        }
+
+
+class QueryTracer:
+    """
+    Per query shape statistics of the SQL run through Database.execute and execute_many. Rows are those
+    fetched from the cursor, or changed for statements without a result set.
+
+    With a dump_path, the stats are also written there as JSON every dump_interval seconds. Dumps
+    piggyback on queries, there is no background thread.
+    """
+
+    def __init__(
+        self, dump_path: str | Path | None = None, dump_interval: float = 60.0
+    ):
+        self.dump_path = Path(dump_path) if dump_path else None
+        self.dump_interval = dump_interval
+        self._queries: dict[str, QueryStats] = {}
+        self._last_dump = time.monotonic()
+
+    def trace(
+        self, cursor: sqlite3.Cursor, sql: str, seconds: float
+    ) -> "TracedCursor | sqlite3.Cursor":
+        """Record an executed statement, returning the cursor wrapped to count its fetches."""
+        shape = normalize_sql(sql)
+        stats = self._queries.get(shape)
+        if stats is None:
+            stats = self._queries[shape] = QueryStats()
+
+        stats.count += 1
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+
+        if self.dump_path and time.monotonic() - self._last_dump >= self.dump_interval:
+            self.dump()
+
+        if cursor.description is None:
+            stats.rows += max(cursor.rowcount, 0)
+            return cursor
+        return TracedCursor(cursor, stats, seconds)
+
+    @property
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Stats per query shape, most total time first."""
+        ordered = sorted(self._queries.items(), key=lambda item: -item[1].total_seconds)
+        return {shape: stats.as_dict() for shape, stats in ordered}
+
+    def top(self, n: int = 10) -> dict[str, dict[str, float]]:
+        return dict(list(self.stats.items())[:n])
+
+    def clear(self) -> None:
+        self._queries.clear()
+
+    def dump(self, path: str | Path | None = None) -> Path:
+        """Write the stats as JSON (atomically, via a temporary file), to dump_path by default."""
+        path = Path(path or self.dump_path)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.stats, indent=4), encoding="utf-8")
+        os.replace(tmp, path)
+        self._last_dump = time.monotonic()
+        return path
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+
+class TracedCursor:
+    """A cursor adding the time and rows of its fetches to the stats of its query shape."""
+
+    FETCH_SIZE = 256
+
+    def __init__(self, cursor: sqlite3.Cursor, stats: QueryStats, seconds: float):
+        self._cursor = cursor
+        self._stats = stats
+        self._seconds = seconds
+
+    def _record(self, start: float, rows: int) -> None:
+        elapsed = time.perf_counter() - start
+        self._seconds += elapsed
+        self._stats.total_seconds += elapsed
+        self._stats.max_seconds = max(self._stats.max_seconds, self._seconds)
+        self._stats.rows += rows
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._record(start, row is not None)
+        return row
+
+    def fetchmany(self, size: int | None = None) -> list:
+        start = time.perf_counter()
+        rows = self._cursor.fetchmany(size or self._cursor.arraysize)
+        self._record(start, len(rows))
+        return rows
+
+    def fetchall(self) -> list:
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._record(start, len(rows))
+        return rows
+
+    def __iter__(self):
+        while rows := self.fetchmany(self.FETCH_SIZE):
+            yield from rows
+
+    def __getattr__(self, name: str):
+        return getattr(self._cursor, name)
@@ -1,6 +1,7 @@
 # These DTOS are the final product delivered to the user.
 
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields, is_dataclass, FrozenInstanceError
+from functools import cache
 import json
 from abc import ABC
 
@@ -70,3 +71,97 @@ class City(DTO):
     population: int | None
     lat: float
     lng: float
+
+
+# Read-only DTOs, shared by the registries' identity maps.
+
+
+class _ReadOnlyList(list):
+    """A list raising on mutation, the sequences of a frozen DTO."""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Frozen DTOs are read-only, thaw() one for a mutable copy")
+
+    append = extend = insert = remove = pop = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+    def __reduce__(self):
+        return _ReadOnlyList, (list(self),)
+
+
+class _Frozen:
+    """Base of the read-only twins of the DTO classes made by freeze(), equal to their mutable DTOs."""
+
+    __slots__ = ()
+    _base: type
+
+    def __init__(self, *args, **kwargs):
+        # lets dataclasses.replace() build a modified frozen copy
+        _set_fields(self, self._base(*args, **kwargs))
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __eq__(self, other):
+        if not isinstance(other, self._base):
+            return NotImplemented
+        return all(
+            getattr(self, f.name) == getattr(other, f.name) for f in fields(self._base)
+        )
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return freeze, (thaw(self),)
+
+    def to_dict(self):
+        return asdict(thaw(self))
+
+
+@cache
+def _frozen_class(cls: type) -> type:
+    return type(cls)(cls.__name__, (_Frozen, cls), {"__slots__": (), "_base": cls})
+
+
+def _set_fields(frozen: _Frozen, source) -> None:
+    for f in fields(source):
+        object.__setattr__(frozen, f.name, _freeze_value(getattr(source, f.name)))
+
+
+def _freeze_value(value):
+    if isinstance(value, list):
+        return _ReadOnlyList(_freeze_value(v) for v in value)
+    if is_dataclass(value) and not isinstance(value, type):
+        return freeze(value)
+    return value
+
+
+def _thaw_value(value):
+    if isinstance(value, list):
+        return [_thaw_value(v) for v in value]
+    if isinstance(value, _Frozen):
+        return thaw(value)
+    return value
+
+
+def freeze(dto):
+    """
+    A read-only copy of a DTO (nested DTOs and lists included): assigning a field raises
+    dataclasses.FrozenInstanceError, mutating a list a TypeError. It is still an instance of, and
+    equal to, its DTO class.
+    """
+    if isinstance(dto, _Frozen):
+        return dto
+    frozen = _frozen_class(type(dto)).__new__(_frozen_class(type(dto)))
+    _set_fields(frozen, dto)
+    return frozen
+
+
+def thaw(dto):
+    """A mutable copy of a frozen DTO, or the DTO itself if it is not frozen."""
+    if not isinstance(dto, _Frozen):
+        return dto
+    return dto._base(**{f.name: _thaw_value(getattr(dto, f.name)) for f in fields(dto)})
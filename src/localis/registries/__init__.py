@@ -2,3 +2,4 @@ from .country_registry import CountryRegistry
 from .subdivision_registry import SubdivisionRegistry
 from .city_registry import CityRegistry
 from .registry import Registry
+from .identity_map import IdentityMap
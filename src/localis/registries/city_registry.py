@@ -1,10 +1,27 @@
 from localis.registries.registry import Registry
-from localis.data import CityModel, City, MetaStore, db
-from localis.utils import pad_num_w_zeros
+from localis.search import FuzzySearch
+from localis.utils import user_cache_dir
+from localis.data import CityModel, City, MetaStore, CityRTree, db
+from localis.spatial import GridIndex, haversine, EARTH_RADIUS_KM
+from localis.spatial.arrays import distance_matrix, bin_sum
+from localis.spatial.geohash import (
+    BASE32,
+    encode as encode_geohash,
+    neighbors as geohash_neighbors,
+)
+from typing import Literal
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+import math
 import requests
 import io
 import localis
 import os
+import hashlib
 
 
 class CityRegistry(Registry[CityModel, City]):
@@ -23,6 +40,18 @@ class CityRegistry(Registry[CityModel, City]):
     SEARCH_ORDER_FIELDS = ["population"]
 
     META_URL_KEY = "cities_tsv_url"
+    META_SHA256_KEY = "cities_tsv_sha256"
+    META_DB_URL_KEY = "cities_db_url"
+    META_DB_SHA256_KEY = "cities_db_sha256"
+
+    PROGRESS_EVERY = 10000
+    """Rows between progress updates while loading."""
+
+    DOWNLOAD_CHUNK = 1 << 20
+    """Bytes per read while copying a prebuilt database."""
+
+    NEAR_PRECISIONS = (3, 2)
+    """Geohash precisions tried by search(near=...), ~156km then ~1250km cells (plus neighbours)."""
 
     def __init__(self, model_cls):
         super().__init__(model_cls)
@@ -33,17 +62,31 @@ class CityRegistry(Registry[CityModel, City]):
         """WARNING: Do not mutate directly, controlled by set_loaded()"""
         self.set_loaded()
 
+        self._columns: dict[str, array] | None = None
+        self._grid: GridIndex | None = None
+        self._vector_grid = None
+
     def set_loaded(self) -> bool:
         self._loaded = db.CONFIG_FILE.exists()
 
-    def load(self, confirmed: bool = False, custom_dir: str = "") -> None:
+    def load(
+        self, confirmed: bool = False, custom_dir: str = "", from_file: str = None
+    ) -> None:
+        """
+        Place the cities database in custom_dir (default: cwd), attached next to the bundled one.
+
+        A prebuilt cities database (meta, or a .db from_file) is copied into place as is. Otherwise the
+        cities TSV fixture is loaded into an empty database. Either is read from from_file if given,
+        else from a verified copy in the user cache dir, else downloaded. Whenever the expected sha256
+        is known (meta), it is checked against it and a verified copy is cached for the next load.
+        """
         if self._loaded:
             print("Cities data already loaded.")
             return
 
         # USER CONFIRMATION
         confirmed = confirmed or input(
-            "Loading cities is HEAVY, there are nearly half a million entries and it expands the database to 200MB+. Proceeding with load will copy the sqlite database to your project root, download cities.tsv and load it into the copied database and update your .gitignore. Are you sure you want to proceed? [y/N] "
+            "Loading cities is HEAVY, there are nearly half a million entries in a 200MB+ database. Proceeding with load will download the cities database to your project root (attached to the bundled database) and update your .gitignore. Are you sure you want to proceed? [y/N] "
         ).lower() in ["y", "yes"]
 
         # DID NOT CONFIRM
@@ -51,10 +94,32 @@ class CityRegistry(Registry[CityModel, City]):
             print("Aborting load.")
             return
 
-        # COPY DATABASE
-        print(f"Copying database to {custom_dir}/{db.FILENAME}...")
-        path = db.copy_to(custom_dir)
-        db.set_db_path(path)
+        # PICK A SOURCE: a prebuilt database is placed as is, a TSV fixture is loaded row by row
+        db_url = self._meta.get(self.META_DB_URL_KEY)
+        prebuilt = str(from_file).endswith(".db") if from_file else bool(db_url)
+        if prebuilt:
+            url = db_url
+            sha256 = self._meta.get(self.META_DB_SHA256_KEY)
+            suffix = ".db"
+        else:
+            url = self._meta.get(self.META_URL_KEY)
+            sha256 = self._meta.get(self.META_SHA256_KEY)
+            suffix = ".tsv"
+        cache_path = user_cache_dir() / f"cities-{sha256}{suffix}" if sha256 else None
+
+        sources = []
+        if from_file:
+            sources.append(from_file)
+        else:
+            if cache_path and cache_path.exists():
+                sources.append(cache_path)
+            if url:
+                sources.append(url)
+
+        if not sources:
+            raise ValueError(
+                f"Error fetching the cities fixture url, the database (meta table) may have been corrupted. Please submit a new issue: https://github.com/dstoffels/localis/issues.\nCurrent url: {url}"
+            )
 
         # UPDATE GITIGNORE
         print(f"Updating .gitignore...")
@@ -74,36 +139,182 @@ class CityRegistry(Registry[CityModel, City]):
                 f.write("\n")
             f.write(db.FILENAME)
 
-        # DOWNLOAD TSV FIXTURE
-        url = self._meta.get(self.META_URL_KEY)
-        if url:
-            print("Downloading TSV fixture...")
+        path = (Path(custom_dir) if custom_dir else Path.cwd()) / db.FILENAME
+        try:
+            if prebuilt:
+                # PLACE PREBUILT DATABASE
+                self._place_database(sources, sha256, cache_path, path)
+                db.set_db_path(str(path))
+            else:
+                # STREAM TSV FIXTURE INTO AN EMPTY DATABASE
+                print(f"Creating {path}...")
+                path.unlink(missing_ok=True)
+                db.set_db_path(str(path))
+                self._load_fixture(sources, sha256, cache_path)
+        except Exception:
+            # leave no half loaded copy behind
+            db.revert_to_default()
+            self.set_loaded()
+            raise
+
+        self.set_loaded()
+        self._clear_caches()
+        print(f"{self.count} cities loaded.")
+        print(
+            "Run 'localis unload cities' in the CLI or 'localis.cities.unload()' to revert."
+        )
+
+    def _place_database(
+        self, sources: list, sha256: str | None, cache_path: Path | None, path: Path
+    ) -> None:
+        """Copy the first prebuilt cities database that verifies to path. A corrupt cached copy is dropped for the next."""
+        for source in sources:
+            is_cache = source == cache_path
+            if is_cache:
+                print(f"Copying cities database from cache ({source})...")
+            elif str(source).startswith(("http://", "https://")):
+                print("Downloading cities database...")
+            else:
+                print(f"Copying cities database from {source}...")
 
             try:
-                response = requests.get(url)
+                if cache_path and not is_cache:
+                    self._download(source, cache_path, sha256)
+                    self._download(cache_path, path)
+                else:
+                    self._download(source, path, sha256)
+                print()
+                return
+            except ValueError as e:
+                if not is_cache or source is sources[-1]:
+                    raise e
+                print(f"\n{e} Removing cached copy...")
+                cache_path.unlink()
+
+    def _download(
+        self, source: str | os.PathLike, path: Path, sha256: str | None = None
+    ) -> None:
+        """
+        Copy source (http(s) url, file:// url or local path) to path in chunks. With sha256, a
+        mismatching copy raises a ValueError. path is only replaced once the copy is complete.
+        """
+        raw, total, response = self._open_source(source)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        reader = _VerifyingReader(raw, sha256)
+        try:
+            with open(tmp, "wb") as f:
+                while chunk := reader.read(self.DOWNLOAD_CHUNK):
+                    f.write(chunk)
+                    pct = f" ({reader.bytes_read / total:.0%})" if total else ""
+                    print(
+                        f"\r{reader.bytes_read / 1e6:,.1f} MB copied{pct}",
+                        end="",
+                        flush=True,
+                    )
+            os.replace(tmp, path)
+        finally:
+            reader.close()
+            if response is not None:
+                response.close()
+            if tmp.exists():
+                tmp.unlink()
+
+    def _load_fixture(
+        self, sources: list, sha256: str | None, cache_path: Path | None
+    ) -> None:
+        """Load the first source that streams cleanly. A corrupt cached copy is dropped for the next."""
+        for source in sources:
+            is_cache = source == cache_path
+            if is_cache:
+                print(f"Loading cities into database from cache ({source})...")
+            elif str(source).startswith(("http://", "https://")):
+                print("Downloading and loading cities into database...")
+            else:
+                print(f"Loading cities into database from {source}...")
+
+            try:
+                with self._open_fixture(
+                    source, sha256, None if is_cache else cache_path
+                ) as (tsv, progress):
+                    CityModel.load(tsv, progress)
+                print()
+                return
+            except ValueError as e:
+                if not is_cache or source is sources[-1]:
+                    raise e
+                print(f"\n{e} Removing cached copy...")
+                cache_path.unlink()
+
+    @contextmanager
+    def _open_fixture(
+        self,
+        source: str | os.PathLike,
+        sha256: str | None = None,
+        cache_path: Path | None = None,
+    ):
+        """
+        Open the cities TSV (http(s) url, file:// url or local path) as a utf-8 text stream without
+        reading it into memory. Yields the stream and a progress callback reporting rows and bytes read.
+
+        With sha256, reaching the end of a mismatching stream raises a ValueError, so a load reading
+        it rolls back. With cache_path, the bytes are also written there, kept only once verified.
+        """
+        raw, total, response = self._open_source(source)
+
+        cache_tmp = None
+        if cache_path:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_tmp = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        reader = _VerifyingReader(raw, sha256, cache_tmp)
+
+        def progress(rows: int) -> None:
+            if rows % self.PROGRESS_EVERY:
+                return
+            pct = f" ({reader.bytes_read / total:.0%})" if total else ""
+            print(f"\r{rows:,} cities loaded{pct}", end="", flush=True)
+
+        try:
+            yield io.TextIOWrapper(
+                io.BufferedReader(reader), encoding="utf-8", newline=""
+            ), progress
+            if cache_tmp and reader.verified:
+                os.replace(cache_tmp, cache_path)
+        finally:
+            reader.close()
+            if response is not None:
+                response.close()
+            if cache_tmp and cache_tmp.exists():
+                cache_tmp.unlink()
+
+    @staticmethod
+    def _open_source(source: str | os.PathLike) -> tuple:
+        """Open an http(s) url, file:// url or local path as a raw byte stream, returning (raw, total bytes or 0, response or None)."""
+        source = str(source)
+        response = None
+        if source.startswith(("http://", "https://")):
+            try:
+                response = requests.get(source, stream=True)
                 response.raise_for_status()  # just to be safe
             except requests.HTTPError as e:
                 if e.response.status_code == 404:
                     e.add_note(
-                        f"There is a problem with the cities.tsv url, please raise a new issue: https://github.com/dstoffels/localis/issues.\nurl: {url}"
+                        f"There is a problem with the cities fixture url, please raise a new issue: https://github.com/dstoffels/localis/issues.\nurl: {source}"
                     )
                 raise e
-
-            # LOAD TSV INTO DATABASE
-            print("TSV fixture downloaded, loading cities into database...")
-            tsv = io.StringIO(response.text)
-            CityModel.load(tsv)
-
-            self.set_loaded()
-            print(f"{self.count} cities loaded.")
-            print(
-                "Run 'localis unload cities' in the CLI or 'localis.cities.unload()' to revert."
+            raw = response.raw
+            raw.decode_content = True
+            raw.auto_close = (
+                False  # let the text wrapper see EOF instead of a closed file
             )
-
+            total = int(response.headers.get("Content-Length") or 0)
         else:
-            raise ValueError(
-                f"Error fetching the cities fixture url, the database (meta table) may have been corrupted. Please submit a new issue: https://github.com/dstoffels/localis/issues.\nCurrent url: {url}"
-            )
+            if source.startswith("file://"):
+                source = url2pathname(urlparse(source).path)
+            raw = open(source, "rb")
+            total = os.path.getsize(source)
+
+        return raw, total, response
 
     def unload(self) -> None:
         if not self._loaded:
@@ -124,9 +335,31 @@ class CityRegistry(Registry[CityModel, City]):
                 f.truncate()
 
             self.set_loaded()
-            self._count = None
+            self._clear_caches()
             print("Cities successfully unloaded from db.")
 
+    def apply_delta(self, path: str | os.PathLike) -> dict[str, int]:
+        """
+        Apply a cities delta TSV (built by data/cities from GeoNames' daily modifications and deletes)
+        to the loaded database in place, rewriting only the affected rows. Returns the updated,
+        inserted and deleted counts.
+        """
+        self._check_loaded()
+        with open(path, newline="", encoding="utf-8") as f:
+            counts = CityModel.apply_delta(f)
+
+        self._clear_caches()
+        return counts
+
+    def _clear_caches(self) -> None:
+        """Drop everything derived from the cities table, after it changed."""
+        self._count = None
+        self._cache = None
+        self._clear_identity_map()
+        self._columns = None
+        self._grid = None
+        self._vector_grid = None
+
     @property
     def count(self):
         self._check_loaded()
@@ -153,7 +386,15 @@ class CityRegistry(Registry[CityModel, City]):
             if val is not None:
                 model = cls.get_by_id(val) if arg == "id" else cls.get(field == val)
 
-        return model.to_dto() if model is not None else None
+        return self._to_dto(model) if model is not None else None
+
+    def to_columns(self, fields=None, backend="array"):
+        self._check_loaded()
+        return super().to_columns(fields, backend)
+
+    def get_many(self, **kwargs) -> list[City | None]:
+        self._check_loaded()
+        return super().get_many(**kwargs)
 
     def filter(
         self,
@@ -180,9 +421,49 @@ class CityRegistry(Registry[CityModel, City]):
 
         return super().filter(query, name, limit, **kwargs)
 
-    def search(self, query, limit=None, **kwargs):
+    def search(
+        self,
+        query,
+        limit=None,
+        near: tuple[float, float] | None = None,
+        **kwargs,
+    ):
+        """
+        Fuzzy search cities. With near=(lat, lng), candidates are first fetched from the geohash cells
+        around the point, widening to larger cells and finally the whole world until there are enough
+        strong matches, so a weak nearby match does not hide a better one further away. The matches of
+        every widening are merged, equal scores ordered by distance instead of population.
+        """
         self._check_loaded()
-        return super().search(query, limit, **kwargs)
+        if near is None or not query:
+            return super().search(query, limit, **kwargs)
+
+        lat, lng = near
+        self._check_coordinates(lat, lng)
+        self._check_geohash_column()
+
+        matches: dict[int, tuple[City, float]] = {}
+        for precision in (*self.NEAR_PRECISIONS, None):
+            if precision is None:
+                found = self._run_search(query, None)
+            else:
+                cell = encode_geohash(lat, lng, precision)
+                cells = [cell, *geohash_neighbors(cell)]
+                found = self._run_search(
+                    query, None, self._model_cls.geohash.match_filter(cells)
+                )
+            matches.update((city.id, (city, score)) for city, score in found)
+
+            strong = sum(
+                score >= FuzzySearch.STRONG_MATCH_THRESHOLD
+                for _, score in matches.values()
+            )
+            if strong >= (limit or 1):
+                break
+
+        results = list(matches.values())
+        results.sort(key=lambda r: (-r[1], haversine(lat, lng, r[0].lat, r[0].lng)))
+        return results[:limit]
 
     def for_country(
         self,
@@ -209,17 +490,14 @@ class CityRegistry(Registry[CityModel, City]):
             return []
 
         country_field = "|".join([country.name, country.alpha2, country.alpha3])
-        results: list[CityModel] = self._model_cls.select(
-            CityModel.country == country_field
+        results: list[CityModel] = self._model_cls.in_hierarchy(
+            self._order_by,
+            country=country_field,
+            population__gt=population__gt,
+            population__lt=population__lt,
         )
 
-        dtos = [r.to_dto() for r in results]
-        if population__gt is not None:
-            return [d for d in dtos if d.population > population__gt]
-        elif population__lt is not None:
-            return [d for d in dtos if d.population < population__lt]
-        else:
-            return dtos
+        return [self._to_dto(r) for r in results]
 
     def for_subdivision(
         self,
@@ -247,25 +525,302 @@ class CityRegistry(Registry[CityModel, City]):
             return []
 
         sub_field = "|".join([sub.name, sub.geonames_code or "", sub.iso_code or ""])
-        expr = CityModel.admin1 == sub_field
-        if population__lt:
-            expr = expr & (CityModel.population < pad_num_w_zeros(population__lt))
-        elif population__gt:
-            expr = expr & (CityModel.population > pad_num_w_zeros(population__gt))
-        results: list[CityModel] = self._model_cls.select(expr)
-
-        if not results:
-            results = self._model_cls.select(CityModel.admin2 == sub_field)
-
-        dtos = [
-            r.to_dto()
-            for r in results
-            if r.admin1 == sub_field or r.admin2 == sub_field
-        ]
+        admin_field = "admin1" if sub.admin_level == 1 else "admin2"
+        results: list[CityModel] = self._model_cls.in_hierarchy(
+            self._order_by,
+            population__gt=population__gt,
+            population__lt=population__lt,
+            **{admin_field: sub_field},
+        )
 
-        if population__gt is not None:
-            return [d for d in dtos if d.population > population__gt]
-        elif population__lt is not None:
-            return [d for d in dtos if d.population < population__lt]
+        return [self._to_dto(r) for r in results]
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        k: int = 1,
+        min_population: int | None = None,
+    ) -> list[tuple[City, float]]:
+        """
+        Reverse geocode: the k cities nearest to (lat, lng) as (city, distance_km) pairs, nearest first.
+        Optionally ignore cities below min_population.
+
+        NOTE: builds an in-memory grid index over all city coordinates on first use.
+        """
+        self._check_loaded()
+        self._check_coordinates(lat, lng)
+
+        matches = self._spatial_index.nearest(lat, lng, k, min_population)
+        dtos = self.get_many(id=[id for id, _ in matches])
+
+        return [(dto, distance) for dto, (_, distance) in zip(dtos, matches)]
+
+    @property
+    def _spatial_index(self) -> GridIndex:
+        if self._grid is None:
+            columns = self._coordinate_columns
+            self._grid = GridIndex(
+                columns["id"], columns["lat"], columns["lng"], columns["population"]
+            )
+        return self._grid
+
+    def nearest_many(self, lats, lngs, workers: int | None = None) -> tuple:
+        """
+        Bulk reverse geocode: the nearest city to every (lats[i], lngs[i]) point.
+        Returns (ids, distances_km) arrays aligned to the input, pass ids to get_many() for the cities.
+
+        With numpy installed, points are solved in vectorized blocks and the results are numpy arrays,
+        optionally split across `workers` processes. Without numpy, falls back to per point lookups
+        returning stdlib arrays.
+
+        NOTE: builds an in-memory index over all city coordinates on first use.
+        """
+        self._check_loaded()
+        if len(lats) != len(lngs):
+            raise ValueError("lats and lngs must have the same length")
+
+        try:
+            import numpy as np
+        except ImportError:
+            ids, distances = array("q"), array("d")
+            for lat, lng in zip(lats, lngs):
+                self._check_coordinates(lat, lng)
+                [(id, distance)] = self._spatial_index.nearest(lat, lng) or [
+                    (0, math.nan)
+                ]
+                ids.append(id)
+                distances.append(distance)
+            return ids, distances
+
+        from localis.spatial.vector_index import VectorGridIndex
+
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        invalid = ~((np.abs(lats) <= 90) & (np.abs(lngs) <= 180))
+        if invalid.any():
+            i = int(np.argmax(invalid))
+            raise ValueError(f"Invalid coordinates: ({lats[i]}, {lngs[i]})")
+
+        if self._vector_grid is None:
+            columns = self._coordinate_columns
+            self._vector_grid = VectorGridIndex(
+                np.frombuffer(columns["id"], dtype=np.int64),
+                np.frombuffer(columns["lat"], dtype=np.float64),
+                np.frombuffer(columns["lng"], dtype=np.float64),
+            )
+
+        if workers and workers > 1:
+            return self._vector_grid.nearest_parallel(lats, lngs, workers)
+        return self._vector_grid.nearest(lats, lngs)
+
+    @property
+    def _coordinate_columns(self) -> dict[str, array]:
+        """id, lat, lng and population of every city as contiguous arrays, read once per load."""
+        if self._columns is None:
+            self._columns = self.to_columns(["id", "lat", "lng", "population"])
+        return self._columns
+
+    def _column_positions(self, ids) -> list[int]:
+        """Positions of city ids in the coordinate columns, ValueError for unknown ids."""
+        column = self._coordinate_columns["id"]
+        positions = []
+        for id in ids:
+            # to_columns reads in rowid order, so the id column is sorted
+            i = bisect_left(column, id)
+            if i == len(column) or column[i] != id:
+                raise ValueError(f"Unknown city id: {id}")
+            positions.append(i)
+        return positions
+
+    def distance_matrix(self, ids_a: list[int], ids_b: list[int]):
+        """
+        Pairwise great-circle distances (km) between two sets of city ids, without building City DTOs.
+        Returns a len(ids_a) x len(ids_b) numpy array, or a list of array('d') rows without numpy.
+        """
+        self._check_loaded()
+        columns = self._coordinate_columns
+        lats, lngs = columns["lat"], columns["lng"]
+        a = self._column_positions(ids_a)
+        b = self._column_positions(ids_b)
+
+        return distance_matrix(
+            [lats[i] for i in a],
+            [lngs[i] for i in a],
+            [lats[i] for i in b],
+            [lngs[i] for i in b],
+        )
+
+    def bin_population(self, cell_deg: float = 1.0) -> dict[tuple[float, float], int]:
+        """
+        Total city population per lat/lng grid cell of cell_deg degrees, without building City DTOs.
+        Returns {(cell_min_lat, cell_min_lng): population} for every cell containing a city.
+        """
+        self._check_loaded()
+        columns = self._coordinate_columns
+        return bin_sum(columns["lat"], columns["lng"], columns["population"], cell_deg)
+
+    def within_radius(
+        self,
+        lat: float,
+        lng: float,
+        km: float,
+        order_by: Literal["distance", "population"] = "distance",
+        limit: int | None = None,
+    ) -> list[tuple[City, float]]:
+        """
+        Cities within km of (lat, lng) as (city, distance_km) pairs, ordered by distance (nearest first)
+        or population (largest first). Backed by the cities R*Tree.
+        """
+        self._check_loaded()
+        self._check_coordinates(lat, lng)
+        if order_by not in ("distance", "population"):
+            raise ValueError(f"Unsupported order_by: {order_by}")
+
+        # bounding box of the circle
+        angle = km / EARTH_RADIUS_KM
+        d_lat = math.degrees(angle)
+        min_lat, max_lat = max(-90.0, lat - d_lat), min(90.0, lat + d_lat)
+
+        cos_lat = math.cos(math.radians(lat))
+        if min_lat == -90 or max_lat == 90 or math.sin(angle) >= cos_lat:
+            min_lng, max_lng = -180.0, 180.0
         else:
-            return dtos
+            d_lng = math.degrees(math.asin(math.sin(angle) / cos_lat))
+            min_lng = (lng - d_lng + 180) % 360 - 180
+            max_lng = (lng + d_lng + 180) % 360 - 180
+
+        matches = []
+        for row in CityRTree.select(min_lat, min_lng, max_lat, max_lng):
+            distance = haversine(lat, lng, row["lat"], row["lng"])
+            if distance <= km:
+                matches.append((row["id"], distance, row["population"]))
+
+        if order_by == "distance":
+            matches.sort(key=lambda m: m[1])
+        else:
+            matches.sort(key=lambda m: (-m[2], m[1]))
+        matches = matches[:limit]
+
+        dtos = self.get_many(id=[id for id, _, _ in matches])
+        return [(dto, distance) for dto, (_, distance, _) in zip(dtos, matches)]
+
+    def within_bbox(
+        self,
+        min_lat: float,
+        min_lng: float,
+        max_lat: float,
+        max_lng: float,
+        order_by: Literal["population"] | None = "population",
+        limit: int | None = None,
+    ) -> list[City]:
+        """
+        Cities inside a lat/lng bounding box, largest first by default. Boxes crossing the antimeridian
+        are given with min_lng > max_lng, e.g. (-20, 170, 0, -170) for Fiji.
+        """
+        self._check_loaded()
+        self._check_coordinates(min_lat, min_lng)
+        self._check_coordinates(max_lat, max_lng)
+        if min_lat > max_lat:
+            raise ValueError("min_lat must not exceed max_lat")
+
+        def in_lng_range(value: float) -> bool:
+            if min_lng <= max_lng:
+                return min_lng <= value <= max_lng
+            return value >= min_lng or value <= max_lng
+
+        matches = [
+            (row["id"], row["population"])
+            for row in CityRTree.select(min_lat, min_lng, max_lat, max_lng)
+            if min_lat <= row["lat"] <= max_lat and in_lng_range(row["lng"])
+        ]
+
+        if order_by == "population":
+            matches.sort(key=lambda m: -m[1])
+        elif order_by is not None:
+            raise ValueError(f"Unsupported order_by: {order_by}")
+        matches = matches[:limit]
+
+        return self.get_many(id=[id for id, _ in matches])
+
+    def in_geohash(
+        self, geohash: str, neighbors: bool = False, limit: int | None = None
+    ) -> list[City]:
+        """
+        Cities inside a geohash cell (any prefix, e.g. "9q8y"), largest first. With neighbors=True the 8
+        surrounding cells are included, covering points near the cell's edges.
+        """
+        self._check_loaded()
+        self._check_geohash(geohash)
+        self._check_geohash_column()
+        cells = [geohash.lower()]
+        if neighbors:
+            cells += geohash_neighbors(cells[0])
+
+        results = self._model_cls.select(
+            self._model_cls.geohash.within(cells), self._order_by, limit
+        )
+        return [self._to_dto(r) for r in results]
+
+    @staticmethod
+    def _check_coordinates(lat: float, lng: float) -> None:
+        if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+            raise ValueError(f"Invalid coordinates: ({lat}, {lng})")
+
+    def _check_geohash_column(self) -> None:
+        if "geohash" not in db.table_columns(self._model_cls.table_name):
+            raise RuntimeError(
+                "The cities database predates geohash lookups. Reload it with `localis.cities.load()` or `localis load cities` from the CLI."
+            )
+
+    @staticmethod
+    def _check_geohash(geohash: str) -> None:
+        if not geohash or not set(geohash.lower()) <= set(BASE32):
+            raise ValueError(f"Invalid geohash: {geohash!r}")
+
+
+class _VerifyingReader(io.RawIOBase):
+    """
+    Raw byte stream wrapper that hashes everything read, optionally copying it to a file, and raises a
+    ValueError at EOF when the sha256 does not match.
+    """
+
+    def __init__(self, raw, sha256: str | None = None, copy_to: Path | None = None):
+        self._raw = raw
+        self._sha256 = sha256
+        self._hash = hashlib.sha256()
+        self._copy = open(copy_to, "wb") if copy_to else None
+        self.bytes_read = 0
+        self.verified = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._raw.read(len(buffer))
+        if not data:
+            self._finish()
+            return 0
+
+        buffer[: len(data)] = data
+        self._hash.update(data)
+        if self._copy:
+            self._copy.write(data)
+        self.bytes_read += len(data)
+        return len(data)
+
+    def _finish(self) -> None:
+        if self.verified:
+            return
+        digest = self._hash.hexdigest()
+        if self._sha256 and digest != self._sha256:
+            raise ValueError(
+                f"Cities fixture checksum mismatch, expected sha256 {self._sha256} but got {digest}."
+            )
+        self.verified = True
+
+    def close(self) -> None:
+        if self._copy:
+            self._copy.close()
+        self._raw.close()
+        super().close()
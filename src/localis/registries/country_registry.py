@@ -42,7 +42,7 @@ class CountryRegistry(Registry[CountryModel, Country]):
             if val is not None:
                 model = cls.get_by_id(val) if arg == "id" else cls.get(field == val)
 
-        return model.to_dto() if model is not None else None
+        return self._to_dto(model) if model is not None else None
 
     def filter(
         self,
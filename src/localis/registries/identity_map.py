@@ -0,0 +1,50 @@
+from collections import OrderedDict
+from typing import Generic, TypeVar
+from localis.data import DTO, Model
+from localis.dtos import freeze
+
+TDTO = TypeVar("TDTO", bound=DTO)
+
+
+class IdentityMap(Generic[TDTO]):
+    """
+    A bounded LRU cache of DTOs keyed by rowid, so repeated hits return the DTO that was already built.
+    The DTOs are shared between callers, so they are frozen (see `localis.dtos.freeze`).
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._dtos: OrderedDict[int, TDTO] = OrderedDict()
+
+    def get_or_build(self, model: Model) -> TDTO:
+        dto = self._dtos.get(model.id)
+        if dto is not None:
+            self.hits += 1
+            self._dtos.move_to_end(model.id)
+            return dto
+
+        self.misses += 1
+        dto = freeze(model.to_dto())
+        self._dtos[model.id] = dto
+        if len(self._dtos) > self.maxsize:
+            self._dtos.popitem(last=False)
+        return dto
+
+    def clear(self) -> None:
+        self._dtos.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._dtos),
+            "maxsize": self.maxsize,
+        }
+
+    def __len__(self) -> int:
+        return len(self._dtos)
@@ -1,9 +1,11 @@
-from typing import Iterator, Generic, TypeVar
+from typing import Iterator, Generic, TypeVar, Literal, Any
+from array import array
 from abc import ABC
 from typing import Type
 from localis.data import DTO, Model
 from localis.data.models.fields import Expression
 from localis.search import FuzzySearch
+from localis.registries.identity_map import IdentityMap
 
 TModel = TypeVar("TModel", bound=Model)
 TDTO = TypeVar("TDTO", bound=DTO)
@@ -24,6 +26,35 @@ class Registry(Generic[TModel, TDTO], ABC):
         self._cache: list[TDTO] = None
         self._order_by: str = ""
         self._addl_search_attrs: list[str] = []
+        self._identity_map: IdentityMap[TDTO] | None = None
+
+    def enable_identity_map(self, maxsize: int = 1024) -> IdentityMap[TDTO]:
+        """
+        Reuse DTOs across get, get_many, filter, search and the hierarchy lookups via a bounded
+        identity map keyed by rowid. Hit/miss counters are available on `registry.identity_map.stats`.
+
+        NOTE: DTOs returned while enabled are shared between callers and read-only, assigning a field
+        raises dataclasses.FrozenInstanceError. `localis.dtos.thaw(dto)` returns a mutable copy.
+        """
+        self._identity_map = IdentityMap(maxsize)
+        return self._identity_map
+
+    def disable_identity_map(self) -> None:
+        self._identity_map = None
+
+    @property
+    def identity_map(self) -> IdentityMap[TDTO] | None:
+        return self._identity_map
+
+    def _clear_identity_map(self) -> None:
+        """Rowids change when data is (re)loaded, drop any DTOs built from the previous data."""
+        if self._identity_map is not None:
+            self._identity_map.clear()
+
+    def _to_dto(self, model: TModel) -> TDTO:
+        if self._identity_map is not None:
+            return self._identity_map.get_or_build(model)
+        return model.to_dto()
 
     @property
     def cache(self):
@@ -46,9 +77,90 @@ class Registry(Generic[TModel, TDTO], ABC):
     def count(self) -> int:
         return self.__len__()
 
+    def to_columns(
+        self,
+        fields: list[str] | None = None,
+        backend: Literal["array", "numpy", "arrow"] = "array",
+    ) -> dict[str, Any] | Any:
+        """
+        Export the registry as columns (default: all fields) without building DTOs.
+
+        - backend="array": dict of stdlib `array` buffers for numeric fields and lists for text.
+        - backend="numpy": dict of numpy arrays (requires numpy).
+        - backend="arrow": a pyarrow.Table (requires pyarrow).
+        """
+        columns = self._model_cls.to_columns(fields)
+
+        if backend == "array":
+            return columns
+        elif backend == "numpy":
+            try:
+                import numpy as np
+            except ImportError as e:
+                e.add_note("backend='numpy' requires numpy: pip install numpy")
+                raise e
+
+            return {
+                name: (
+                    np.frombuffer(col, dtype=col.typecode)
+                    if isinstance(col, array)
+                    else np.array(col, dtype=object)
+                )
+                for name, col in columns.items()
+            }
+        elif backend == "arrow":
+            try:
+                import pyarrow as pa
+            except ImportError as e:
+                e.add_note("backend='arrow' requires pyarrow: pip install pyarrow")
+                raise e
+
+            arrow_types = {"q": pa.int64(), "d": pa.float64()}
+            return pa.table(
+                {
+                    name: (
+                        pa.Array.from_buffers(
+                            arrow_types[col.typecode],
+                            len(col),
+                            [None, pa.py_buffer(col)],
+                        )
+                        if isinstance(col, array)
+                        else pa.array(col, type=pa.string())
+                    )
+                    for name, col in columns.items()
+                }
+            )
+        else:
+            raise ValueError(f"Unsupported backend: {backend}")
+
     def get(self, *, id: int | None = None, **kwargs) -> TDTO | None:
         return None
 
+    def get_many(self, **kwargs) -> list[TDTO | None]:
+        """
+        Bulk get by a single ID field, e.g. `get_many(alpha2=["US", "CA"])`.
+        Returns results in input order with None for misses, repeated keys are fetched once.
+        """
+        provided = {
+            k: v for k, v in kwargs.items() if k in self.ID_FIELDS and v is not None
+        }
+        if not provided:
+            return []
+        if len(provided) > 1:
+            raise ValueError(
+                f"get_many accepts a single id field, got {list(provided)}"
+            )
+
+        field, values = provided.popitem()
+        models = self._model_cls.get_many(field, list(values))
+
+        dtos: dict[int, TDTO] = {}
+        for m in models:
+            if m is not None and m.id not in dtos:
+                dtos[m.id] = self._to_dto(m)
+
+        return [dtos[m.id] if m is not None else None for m in models]
+
     def filter(
         self, query: str = None, name: str = None, limit: int = None, **kwargs
     ) -> list[TDTO]:
@@ -62,18 +174,25 @@ class Registry(Generic[TModel, TDTO], ABC):
             results = self._model_cls.fts_match(query, order_by=["rank"], limit=limit)
         else:
             return []
-        return [r.to_dto() for r in results]
+        return [self._to_dto(r) for r in results]
 
     def search(self, query: str, limit=None, **kwargs) -> list[tuple[TDTO, float]]:
         if not query:
             return []
 
+        return self._run_search(query, limit)
+
+    def _run_search(
+        self, query: str, limit: int | None, match_filter: str | None = None
+    ) -> list[tuple[TDTO, float]]:
         search = FuzzySearch(
             query,
             self._model_cls,
             self.SEARCH_FIELD_WEIGHTS,
             self.SEARCH_ORDER_FIELDS,
             limit,
+            self._to_dto,
+            match_filter,
         )
 
         return search.run()
@@ -23,7 +23,7 @@ class SubdivisionRegistry(Registry[SubdivisionModel, Subdivision]):
         id: int = None,
         iso_code: str = None,
         geonames_code: str = None,
-        **kwargs
+        **kwargs,
     ):
         cls = self._model_cls
 
@@ -39,7 +39,7 @@ class SubdivisionRegistry(Registry[SubdivisionModel, Subdivision]):
             if val is not None:
                 model = cls.get_by_id(val) if arg == "id" else cls.get(field == val)
 
-        return model.to_dto() if model is not None else None
+        return self._to_dto(model) if model is not None else None
 
     def filter(
         self,
@@ -49,7 +49,7 @@ class SubdivisionRegistry(Registry[SubdivisionModel, Subdivision]):
         type: str = None,
         country: str = None,
         alt_name: str = None,
-        **kwargs
+        **kwargs,
     ):
         if kwargs:
             return []
@@ -70,7 +70,7 @@ class SubdivisionRegistry(Registry[SubdivisionModel, Subdivision]):
         alpha2: str = None,
         alpha3: str = None,
         numeric: int = None,
-        **kwargs
+        **kwargs,
     ) -> list[Subdivision]:
         """Get all subdivisions for a given country by id, alpha2, alpha3 or numeric code. Can filter results by admin_level (default=1)."""
         provided = {
@@ -83,13 +83,68 @@ class SubdivisionRegistry(Registry[SubdivisionModel, Subdivision]):
             return []
 
         country_field = "|".join([country.name, country.alpha2, country.alpha3])
-        results: list[SubdivisionModel] = self._model_cls.select(
-            SubdivisionModel.country == country_field
+        results: list[SubdivisionModel] = self._model_cls.in_hierarchy(
+            country=country_field, admin_level=admin_level
         )
 
-        dtos = [r.to_dto() for r in results]
+        return [self._to_dto(r) for r in results]
 
-        return [d for d in dtos if d.admin_level == admin_level or admin_level == None]
+    def children(
+        self,
+        *,
+        id: int = None,
+        iso_code: str = None,
+        geonames_code: str = None,
+        **kwargs,
+    ) -> list[Subdivision]:
+        """Get the direct children of a subdivision (e.g. the counties of a state) by id, iso_code or geonames_code."""
+        sub_id = self._resolve_id(id=id, iso_code=iso_code, geonames_code=geonames_code)
+        if sub_id is None:
+            return []
+
+        return [
+            self._to_dto(m) for m in self._model_cls.descendants_of(sub_id, depth=1)
+        ]
+
+    def descendants(
+        self,
+        *,
+        id: int = None,
+        iso_code: str = None,
+        geonames_code: str = None,
+        **kwargs,
+    ) -> list[Subdivision]:
+        """Get every subdivision below a subdivision by id, iso_code or geonames_code, nearest first."""
+        sub_id = self._resolve_id(id=id, iso_code=iso_code, geonames_code=geonames_code)
+        if sub_id is None:
+            return []
+
+        return [self._to_dto(m) for m in self._model_cls.descendants_of(sub_id)]
+
+    def ancestors(
+        self,
+        *,
+        id: int = None,
+        iso_code: str = None,
+        geonames_code: str = None,
+        **kwargs,
+    ) -> list[Subdivision]:
+        """Get every subdivision above a subdivision by id, iso_code or geonames_code, parent first."""
+        sub_id = self._resolve_id(id=id, iso_code=iso_code, geonames_code=geonames_code)
+        if sub_id is None:
+            return []
+
+        return [self._to_dto(m) for m in self._model_cls.ancestors_of(sub_id)]
+
+    def _resolve_id(self, *, id: int = None, **kwargs) -> int | None:
+        """Resolve a subdivision id from any of its ID_FIELDS without building a DTO when the id is given."""
+        if id is not None:
+            return id
+        provided = {k: v for k, v in kwargs.items() if v is not None}
+        if not provided:
+            return None
+        sub = self.get(**provided)
+        return sub.id if sub is not None else None
 
     def types_for_country(
         self,
@@ -99,7 +154,7 @@ class SubdivisionRegistry(Registry[SubdivisionModel, Subdivision]):
         alpha2: str = None,
         alpha3: str = None,
         numeric: int = None,
-        **kwargs
+        **kwargs,
     ) -> list[str]:
         """Fetch a list of distinct subdivision types for a given country by id, alpha2, alpha3 or numeric code. Can filter results by admin level (default=1)"""
         provided = {
@@ -3,6 +3,7 @@
 from localis.data import Model
 from localis.dtos import DTO
 from abc import abstractmethod, ABC
+from typing import Callable
 
 
 class SearchEngine(ABC):
@@ -19,6 +20,8 @@ class SearchEngine(ABC):
         field_weights: dict[str, float],
         orderby_fields: list[str],
         limit: int = None,
+        to_dto: Callable[[Model], DTO] | None = None,
+        match_filter: str | None = None,
     ):
         self.query: str = query.lower()
         self.tokens = self.query.split()
@@ -26,6 +29,9 @@ class SearchEngine(ABC):
         self.field_weights: dict[str, float] = field_weights
         self.orderby_fields: list[str] = orderby_fields
         self.limit: int | None = limit
+        self._to_dto: Callable[[Model], DTO] = to_dto or (lambda m: m.to_dto())
+        self.match_filter: str | None = match_filter
+        """Extra FTS5 expression restricting every candidate fetch, e.g. to a region."""
 
         self._max_score = sum(field_weights.values())
         self._iterations = max(len(t) for t in self.tokens)
@@ -66,7 +72,11 @@ class SearchEngine(ABC):
         order_by = ["rank"] if exact or i == self._iterations - 2 else []
 
         return self.model_cls.fts_match(
-            fts_q, exact_match=exact, limit=self.FTS_HARD_LIMIT, order_by=order_by
+            fts_q,
+            exact_match=exact,
+            limit=self.FTS_HARD_LIMIT,
+            order_by=order_by,
+            match_filter=self.match_filter,
         )
 
     def _score_candidates(self, candidates: list[Model]):
@@ -114,7 +124,7 @@ class SearchEngine(ABC):
     @property
     def results(self) -> list[tuple[DTO, float]]:
         return sorted(
-            [(m.to_dto(), score) for m, score in self._matches.items()],
+            [(self._to_dto(m), score) for m, score in self._matches.items()],
             key=lambda x: (x[1], *[getattr(x[0], f) for f in self.orderby_fields]),
             reverse=True,
         )[: self.limit]
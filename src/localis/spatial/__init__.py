@@ -0,0 +1,4 @@
+from localis.spatial.geo import haversine, EARTH_RADIUS_KM
+from localis.spatial.grid_index import GridIndex
+from localis.spatial.arrays import distance_matrix, bin_sum
+from localis.spatial import geohash
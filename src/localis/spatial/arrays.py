@@ -0,0 +1,85 @@
+# Bulk great-circle math over coordinate arrays. Uses numpy when installed, stdlib arrays otherwise.
+
+import math
+from array import array
+from localis.spatial.geo import EARTH_RADIUS_KM
+
+
+def distance_matrix(lats_a, lngs_a, lats_b, lngs_b):
+    """
+    Pairwise great-circle distances (km) between points a and points b, given in degrees.
+    Returns a len(a) x len(b) numpy array, or a list of array('d') rows without numpy.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return _distance_matrix_stdlib(lats_a, lngs_a, lats_b, lngs_b)
+
+    lat_a = np.radians(np.asarray(lats_a, dtype=np.float64))[:, None]
+    lng_a = np.radians(np.asarray(lngs_a, dtype=np.float64))[:, None]
+    lat_b = np.radians(np.asarray(lats_b, dtype=np.float64))[None, :]
+    lng_b = np.radians(np.asarray(lngs_b, dtype=np.float64))[None, :]
+
+    h = (
+        np.sin((lat_b - lat_a) / 2) ** 2
+        + np.cos(lat_a) * np.cos(lat_b) * np.sin((lng_b - lng_a) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+
+
+def _distance_matrix_stdlib(lats_a, lngs_a, lats_b, lngs_b) -> list[array]:
+    lat_b = [math.radians(v) for v in lats_b]
+    lng_b = [math.radians(v) for v in lngs_b]
+    cos_b = [math.cos(v) for v in lat_b]
+
+    rows = []
+    for lat, lng in zip(lats_a, lngs_a):
+        lat, lng = math.radians(lat), math.radians(lng)
+        cos_a = math.cos(lat)
+        row = array("d")
+        for la, ln, cb in zip(lat_b, lng_b, cos_b):
+            h = (
+                math.sin((la - lat) / 2) ** 2
+                + cos_a * cb * math.sin((ln - lng) / 2) ** 2
+            )
+            row.append(2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h))))
+        rows.append(row)
+    return rows
+
+
+def bin_sum(lats, lngs, weights, cell_deg: float) -> dict[tuple[float, float], int]:
+    """
+    Sum integer weights per lat/lng grid cell of cell_deg degrees.
+    Returns {(cell_min_lat, cell_min_lng): total} for non-empty cells.
+    """
+    if cell_deg <= 0 or cell_deg > 180:
+        raise ValueError("cell_deg must be within (0, 180]")
+    cols = math.ceil(360 / cell_deg)
+    rows = math.ceil(180 / cell_deg)
+
+    try:
+        import numpy as np
+    except ImportError:
+        totals: dict[int, int] = {}
+        for lat, lng, weight in zip(lats, lngs, weights):
+            row = min(int((lat + 90) // cell_deg), rows - 1)
+            col = int(((lng + 180) % 360) // cell_deg) % cols
+            key = row * cols + col
+            totals[key] = totals.get(key, 0) + weight
+    else:
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        r = np.minimum(((lats + 90) // cell_deg).astype(np.int64), rows - 1)
+        c = (((lngs + 180) % 360) // cell_deg).astype(np.int64) % cols
+        keys, inverse = np.unique(r * cols + c, return_inverse=True)
+        sums = np.bincount(
+            inverse, weights=np.asarray(weights, dtype=np.float64), minlength=len(keys)
+        )
+        totals = dict(zip(keys.tolist(), sums.astype(np.int64).tolist()))
+
+    return {
+        (row * cell_deg - 90, col * cell_deg - 180): total
+        for row, col, total in (
+            (*divmod(key, cols), total) for key, total in totals.items()
+        )
+    }
@@ -0,0 +1,25 @@
+# Great-circle helpers shared by the spatial indexes.
+
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in km between two points given in degrees."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+def hav_to_km(h: float) -> float:
+    """Convert a haversine term back to a distance in km."""
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+def km_to_hav(km: float) -> float:
+    """Convert a distance in km to a haversine term, for comparisons without asin."""
+    return math.sin(min(math.pi / 2, km / (2 * EARTH_RADIUS_KM))) ** 2
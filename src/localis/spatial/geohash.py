@@ -0,0 +1,81 @@
+# Geohashes: base32 strings of interleaved lng/lat bisections, nearby points share prefixes.
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(BASE32)}
+
+PRECISION = 9
+"""Default geohash length, cells of ~4.8 x 4.8 m."""
+
+
+def encode(lat: float, lng: float, precision: int = PRECISION) -> str:
+    """Geohash of a point given in degrees."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # even bits bisect longitude
+
+    while len(chars) < precision:
+        rng, coord = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = value = 0
+
+    return "".join(chars)
+
+
+def decode(geohash: str) -> tuple[float, float, float, float]:
+    """Bounding box (min_lat, min_lng, max_lat, max_lng) of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash.lower():
+        if char not in _DECODE:
+            raise ValueError(f"Invalid geohash: {geohash}")
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+
+def neighbors(geohash: str) -> list[str]:
+    """The (up to) 8 cells surrounding a geohash cell, same precision. Wraps around the antimeridian."""
+    min_lat, min_lng, max_lat, max_lng = decode(geohash)
+    d_lat = max_lat - min_lat
+    d_lng = max_lng - min_lng
+    lat = (min_lat + max_lat) / 2
+    lng = (min_lng + max_lng) / 2
+
+    cells = []
+    for dy in (1, 0, -1):
+        n_lat = lat + dy * d_lat
+        if not -90 < n_lat < 90:
+            continue
+        for dx in (-1, 0, 1):
+            if dx == dy == 0:
+                continue
+            n_lng = (lng + dx * d_lng + 180) % 360 - 180
+            cell = encode(n_lat, n_lng, len(geohash))
+            if cell != geohash and cell not in cells:
+                cells.append(cell)
+
+    return cells
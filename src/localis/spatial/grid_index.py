@@ -0,0 +1,147 @@
+from array import array
+import heapq
+import math
+from localis.spatial.geo import EARTH_RADIUS_KM, hav_to_km, km_to_hav
+
+
+class GridIndex:
+    """
+    An in-memory lat/lng grid over point columns (e.g. from `Registry.to_columns`).
+
+    Points are bucketed into CELL_DEG x CELL_DEG cells. Nearest-neighbour queries scan rings of cells
+    outward from the query cell and stop once no unvisited cell can hold a closer point.
+    """
+
+    CELL_DEG = 0.25
+    """Cell size in degrees. Must divide 360, so the columns tile the globe exactly."""
+
+    def __init__(
+        self,
+        ids: array,
+        lats: array,
+        lngs: array,
+        populations: array | None = None,
+        cell_deg: float = CELL_DEG,
+    ):
+        cols = 360 / cell_deg if cell_deg > 0 else 0
+        if not (0 < cell_deg <= 180 and math.isclose(cols, round(cols))):
+            raise ValueError("cell_deg must be within (0, 180] and divide 360")
+
+        self.ids = ids
+        self.lats = lats
+        self.lngs = lngs
+        self.populations = populations
+        self.cell_deg = cell_deg
+
+        self._rows = math.ceil(180 / cell_deg)
+        self._cols = round(cols)
+
+        # precomputed for the haversine term
+        self._lat_rad = array("d", map(math.radians, lats))
+        self._lng_rad = array("d", map(math.radians, lngs))
+        self._cos_lat = array("d", map(math.cos, self._lat_rad))
+
+        self._cells: dict[int, array] = {}
+        for i, (lat, lng) in enumerate(zip(lats, lngs)):
+            key = self._key(*self._cell(lat, lng))
+            cell = self._cells.get(key)
+            if cell is None:
+                cell = self._cells[key] = array("l")
+            cell.append(i)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _cell(self, lat: float, lng: float) -> tuple[int, int]:
+        row = min(self._rows - 1, max(0, int((lat + 90) // self.cell_deg)))
+        col = int(((lng + 180) % 360) // self.cell_deg) % self._cols
+        return row, col
+
+    def _key(self, row: int, col: int) -> int:
+        return row * self._cols + col
+
+    def _ring(self, row: int, col: int, r: int):
+        """Yield the indices of the points in the cells on ring r around (row, col)."""
+        wraps = 2 * r + 1 >= self._cols
+        prev_wraps = 2 * r - 1 >= self._cols
+
+        for rr in range(max(0, row - r), min(self._rows, row + r + 1)):
+            if rr in (row - r, row + r):
+                cols = range(self._cols) if wraps else range(col - r, col + r + 1)
+            elif not wraps:
+                cols = (col - r, col + r)
+            elif not prev_wraps:
+                # first ring to wrap the globe: the columns earlier rings did not reach
+                cols = (
+                    c
+                    for c in range(self._cols)
+                    if min((c - col) % self._cols, (col - c) % self._cols) >= r
+                )
+            else:
+                continue
+
+            for c in cols:
+                cell = self._cells.get(self._key(rr, c % self._cols))
+                if cell:
+                    yield from cell
+
+    def _bound(self, lat: float, lng: float, row: int, col: int, r: int) -> float:
+        """Lower bound (km) on the distance from (lat, lng) to any point outside ring r."""
+        south = (row - r) * self.cell_deg - 90
+        north = (row + r + 1) * self.cell_deg - 90
+        lat_km = math.radians(min(lat - south, north - lat)) * EARTH_RADIUS_KM
+
+        if 2 * r + 1 >= self._cols:
+            return lat_km
+
+        west = (col - r) * self.cell_deg - 180
+        east = (col + r + 1) * self.cell_deg - 180
+        lng = (lng + 180) % 360 - 180
+        d_lng = math.radians(min(lng - west, east - lng))
+        # distance from a point to a meridian d_lng away
+        lng_km = EARTH_RADIUS_KM * math.asin(
+            min(1.0, math.cos(math.radians(lat)) * math.sin(min(d_lng, math.pi / 2)))
+        )
+        return min(lat_km, lng_km)
+
+    def nearest(
+        self, lat: float, lng: float, k: int = 1, min_population: int | None = None
+    ) -> list[tuple[int, float]]:
+        """Return up to k (id, distance_km) pairs, nearest first."""
+        if k < 1 or not len(self):
+            return []
+
+        lat_r = math.radians(lat)
+        lng_r = math.radians(lng)
+        cos_lat = math.cos(lat_r)
+        lat_rad, lng_rad, cos_lats = self._lat_rad, self._lng_rad, self._cos_lat
+        pops = self.populations if min_population is not None else None
+        sin = math.sin
+
+        row, col = self._cell(lat, lng)
+        max_ring = max(self._rows, self._cols // 2 + 1)
+        best: list[tuple[float, int]] = []  # max-heap of (-hav, index)
+        visited = 0
+
+        for r in range(max_ring + 1):
+            for i in self._ring(row, col, r):
+                visited += 1
+                if pops is not None and pops[i] < min_population:
+                    continue
+                h = (
+                    sin((lat_rad[i] - lat_r) / 2) ** 2
+                    + cos_lat * cos_lats[i] * sin((lng_rad[i] - lng_r) / 2) ** 2
+                )
+                if len(best) < k:
+                    heapq.heappush(best, (-h, i))
+                elif h < -best[0][0]:
+                    heapq.heapreplace(best, (-h, i))
+
+            if visited == len(self):
+                break
+            if len(best) == k and -best[0][0] <= km_to_hav(
+                self._bound(lat, lng, row, col, r)
+            ):
+                break
+
+        return [(self.ids[i], hav_to_km(-h)) for h, i in sorted(best, reverse=True)]
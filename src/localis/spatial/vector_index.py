@@ -0,0 +1,235 @@
+# NumPy-backed spatial index for bulk nearest-neighbour queries. Requires numpy.
+
+import math
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from localis.spatial.geo import EARTH_RADIUS_KM
+
+
+class _GridLevel:
+    """Point indices sorted by the cells of one grid resolution."""
+
+    def __init__(self, lats, lngs, cell_deg: float):
+        # block edges across the antimeridian are only exact when the columns tile the globe
+        cols = 360 / cell_deg if cell_deg > 0 else 0
+        if not (0 < cell_deg <= 180 and math.isclose(cols, round(cols))):
+            raise ValueError("Grid cell sizes must be within (0, 180] and divide 360")
+
+        self.cell_deg = cell_deg
+        self.rows = math.ceil(180 / cell_deg)
+        self.cols = round(cols)
+
+        keys = self.keys(lats, lngs)
+        self.order = np.argsort(keys, kind="stable")
+        self.cell_keys, starts, counts = np.unique(
+            keys[self.order], return_index=True, return_counts=True
+        )
+        self.cell_starts = starts
+        self.cell_ends = starts + counts
+
+    def cells(self, lats, lngs) -> tuple:
+        rows = np.clip(
+            ((lats + 90) // self.cell_deg).astype(np.int64), 0, self.rows - 1
+        )
+        cols = (((lngs + 180) % 360) // self.cell_deg).astype(np.int64) % self.cols
+        return rows, cols
+
+    def keys(self, lats, lngs):
+        rows, cols = self.cells(lats, lngs)
+        return rows * self.cols + cols
+
+    def block(self, row_lo: int, row_hi: int, col_lo: int, col_hi: int):
+        """Point indices in the cells [row_lo, row_hi] x [col_lo, col_hi], cols wrap around."""
+        rows = np.arange(max(0, row_lo), min(self.rows - 1, row_hi) + 1)
+        if col_hi - col_lo + 1 >= self.cols:
+            cols = np.arange(self.cols)
+        else:
+            cols = np.arange(col_lo, col_hi + 1) % self.cols
+
+        keys = (rows[:, None] * self.cols + cols[None, :]).ravel()
+        pos = np.minimum(np.searchsorted(self.cell_keys, keys), len(self.cell_keys) - 1)
+        pos = pos[self.cell_keys[pos] == keys]
+        if not len(pos):
+            return np.empty(0, dtype=np.int64)
+
+        return self.order[
+            np.concatenate(
+                [
+                    np.arange(s, e)
+                    for s, e in zip(self.cell_starts[pos], self.cell_ends[pos])
+                ]
+            )
+        ]
+
+    def bound(self, lats, lngs, row_lo: int, row_hi: int, col_lo: int, col_hi: int):
+        """Per point lower bound (radians) on the distance to anything outside the block."""
+        # a block reaching a pole has nothing beyond it in that direction
+        d = np.full(len(lats), np.inf)
+        if row_lo > 0:
+            d = np.minimum(d, np.radians(lats - (row_lo * self.cell_deg - 90)))
+        if row_hi < self.rows - 1:
+            d = np.minimum(d, np.radians((row_hi + 1) * self.cell_deg - 90 - lats))
+
+        if col_hi - col_lo + 1 < self.cols:
+            west = col_lo * self.cell_deg - 180
+            east = (col_hi + 1) * self.cell_deg - 180
+            lngs = (lngs + 180) % 360 - 180
+            d_lng = np.radians(np.minimum(lngs - west, east - lngs))
+            d_lng = np.arcsin(
+                np.clip(
+                    np.cos(np.radians(lats)) * np.sin(np.minimum(d_lng, np.pi / 2)),
+                    0,
+                    1,
+                )
+            )
+            d = np.minimum(d, d_lng)
+
+        return d
+
+
+class VectorGridIndex:
+    """
+    Points bucketed by lat/lng grid cells at a few resolutions, queried in bulk.
+
+    Query points are grouped by block of cells and every group is solved at once: a matrix product of
+    unit vectors against the points of the block and its neighbouring cells, then a row-wise argmax.
+    Points whose nearest match could lie outside that block (sparse areas) fall through to the next,
+    coarser level, and a full scan at the end, so the python loop runs per group, never per point.
+    """
+
+    LEVELS = (0.5, 4.0, 30.0)
+    """Cell sizes (degrees), finest first. Each must divide 360."""
+    GROUP = 4
+    """Query points are solved together per GROUP x GROUP cells."""
+    MAX_MATRIX = 4_000_000
+    """Max elements per dot product matrix, bounds memory per group."""
+
+    def __init__(self, ids, lats, lngs, levels: tuple[float, ...] = LEVELS):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self._lats = np.asarray(lats, dtype=np.float64)
+        self._lngs = np.asarray(lngs, dtype=np.float64)
+        self._xyz = _unit_vectors(self._lats, self._lngs)
+        self._levels = [_GridLevel(self._lats, self._lngs, deg) for deg in levels]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _solve(self, xyz, candidates) -> tuple:
+        """Index and cosine of the nearest candidate for each query unit vector."""
+        best_idx = np.zeros(len(xyz), dtype=np.int64)
+        best_cos = np.full(len(xyz), -np.inf)
+        if not len(candidates):
+            return best_idx, best_cos
+
+        step = max(1, self.MAX_MATRIX // len(candidates))
+        c_xyz = self._xyz[candidates].T
+
+        for i in range(0, len(xyz), step):
+            dots = xyz[i : i + step] @ c_xyz
+            arg = np.argmax(dots, axis=1)
+            best_idx[i : i + step] = candidates[arg]
+            best_cos[i : i + step] = dots[np.arange(len(arg)), arg]
+
+        return best_idx, best_cos
+
+    def _solve_level(self, level: _GridLevel, lats, lngs, xyz, pending, best_idx):
+        """Solve the pending points on one level, returning the points it could not settle."""
+        rows, cols = level.cells(lats[pending], lngs[pending])
+        keys = (rows // self.GROUP) * level.cols + cols // self.GROUP
+        order = np.argsort(keys, kind="stable")
+        group_keys, group_starts = np.unique(keys[order], return_index=True)
+        group_ends = np.append(group_starts[1:], len(order))
+
+        unsettled = []
+        for key, start, end in zip(group_keys, group_starts, group_ends):
+            points = pending[order[start:end]]
+            g_row, g_col = divmod(int(key), level.cols)
+            block = (
+                g_row * self.GROUP - 1,
+                (g_row + 1) * self.GROUP,
+                g_col * self.GROUP - 1,
+                (g_col + 1) * self.GROUP,
+            )
+
+            idx, cos = self._solve(xyz[points], level.block(*block))
+            best_idx[points] = idx
+
+            # settled when the best match is closer than the nearest edge of the block
+            bound = level.bound(lats[points], lngs[points], *block)
+            ok = np.arccos(np.clip(cos, -1, 1)) <= bound
+            unsettled.append(points[~ok])
+
+        return np.concatenate(unsettled) if unsettled else pending[:0]
+
+    def nearest(self, lats, lngs) -> tuple:
+        """Return (ids, distances_km) arrays with the nearest point to every query point."""
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        if lats.shape != lngs.shape:
+            raise ValueError("lats and lngs must have the same shape")
+        if not len(lats) or not len(self):
+            return np.zeros(len(lats), dtype=np.int64), np.full(len(lats), np.nan)
+
+        xyz = _unit_vectors(lats, lngs)
+        best_idx = np.zeros(len(lats), dtype=np.int64)
+
+        pending = np.arange(len(lats))
+        for level in self._levels:
+            if not len(pending):
+                break
+            pending = self._solve_level(level, lats, lngs, xyz, pending, best_idx)
+
+        if len(pending):
+            best_idx[pending], _ = self._solve(xyz[pending], np.arange(len(self)))
+
+        # exact haversine for the matched pairs only
+        lat1, lng1 = np.radians(lats), np.radians(lngs)
+        lat2, lng2 = np.radians(self._lats[best_idx]), np.radians(self._lngs[best_idx])
+        h = (
+            np.sin((lat2 - lat1) / 2) ** 2
+            + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+        )
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+
+        return self.ids[best_idx], distances
+
+    def nearest_parallel(self, lats, lngs, workers: int) -> tuple:
+        """nearest() split across worker processes, each receiving a copy of the index once."""
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        if lats.shape != lngs.shape:
+            raise ValueError("lats and lngs must have the same shape")
+
+        # split in cell order so each worker sees compact regions
+        order = np.argsort(self._levels[0].keys(lats, lngs), kind="stable")
+        chunks = np.array_split(order, workers)
+
+        ids = np.empty(len(lats), dtype=np.int64)
+        distances = np.empty(len(lats), dtype=np.float64)
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(self,)
+        ) as pool:
+            results = pool.map(_worker_nearest, [(lats[c], lngs[c]) for c in chunks])
+            for chunk, (chunk_ids, chunk_distances) in zip(chunks, results):
+                ids[chunk] = chunk_ids
+                distances[chunk] = chunk_distances
+
+        return ids, distances
+
+
+def _unit_vectors(lats, lngs):
+    lat, lng = np.radians(lats), np.radians(lngs)
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)))
+
+
+_worker_index: VectorGridIndex | None = None
+
+
+def _init_worker(index: VectorGridIndex) -> None:
+    global _worker_index
+    _worker_index = index
+
+
+def _worker_nearest(args: tuple) -> tuple:
+    return _worker_index.nearest(*args)
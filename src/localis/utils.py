@@ -1,3 +1,11 @@
+from typing import Iterable, Iterator, TypeVar
+from pathlib import Path
+import os
+import sys
+
+T = TypeVar("T")
+
+
 def prep_fts_tokens(s: str, exact_match: bool) -> str:
     """Wrap each token in quotes and at * wildcard for prefixing if not exact_match"""
     if not s:
@@ -22,6 +30,33 @@ def chunked(list: list, size: int):
         yield list[i : i + size]
 
 
+def batched(iterable: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Yield lists of up to size items from any iterable, holding only one batch in memory."""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def byte_ranges(path: str | Path, parts: int, start: int = 0) -> list[tuple[int, int]]:
+    """Split a file from byte start into up to parts (start, end) ranges, each ending on a line break."""
+    size = os.path.getsize(path)
+    step = max(1, (size - start) // max(1, parts))
+    ranges = []
+    with open(path, "rb") as f:
+        while start < size:
+            f.seek(min(start + step, size))
+            f.readline()  # run on to the end of the line
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
 MAX_DIGITS = 8
 
 
@@ -31,3 +66,21 @@ def pad_num_w_zeros(val: str | int) -> str:
     For consistent string-based sorting and comparison.
     """
     return f"{int(val):0{MAX_DIGITS}d}"
+
+
+def user_cache_dir(app: str = "localis") -> Path:
+    """
+    Per-user cache directory for app: $LOCALIS_CACHE_DIR if set, else the platform default
+    (%LOCALAPPDATA%, ~/Library/Caches or $XDG_CACHE_HOME/~/.cache). Not created here.
+    """
+    if override := os.environ.get("LOCALIS_CACHE_DIR"):
+        return Path(override)
+
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+
+    return base / app
@@ -1,108 +1,437 @@
+import argparse
+import hashlib
 import json
-from datetime import datetime
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
 import time
+from datetime import datetime
+from importlib import metadata
+from pathlib import Path
+from typing import Callable, NamedTuple
 from localis.dtos import DTO
 from localis.registries import Registry
 import localis
 from tests.utils import mangle
-import random
+from tests.analysis.load_benchmarks import benchmark as benchmark_load
 
+REGISTRIES = ["countries", "subdivisions", "cities"]
+BENCHMARKS = ["search", "get", "filter", "load"]
 ITERATIONS = 1
 SAMPLE_SIZE = 300
+SEED = 42
+LIMIT = 15
+RESULTS_FILE = Path(__file__).parent / "search_benchmarks.json"
+SETTINGS = {
+    "iterations": ITERATIONS,
+    "sample_size": SAMPLE_SIZE,
+    "seed": SEED,
+    "limit": LIMIT,
+}
+"""Run settings stored with every result, inherited from the baseline when comparing."""
 
 
-def benchmark():
-    registries: list[str] = [
-        "countries",
-        "subdivisions",
-        "cities",
-    ]
-    results: dict[str, str | set] = {
-        "iterations": ITERATIONS,
-        "sample_size": SAMPLE_SIZE,
+class Tolerance(NamedTuple):
+    """How far a metric may move the wrong way before it counts as a regression."""
+
+    higher_is_better: bool
+    limit: float
+    relative: bool = True
+    floor: float = 0.0
+    """Absolute change (in the metric's unit) below which a relative move is noise."""
+
+
+TOLERANCES = {
+    "success_rate": Tolerance(True, 0.01, relative=False),
+    "top1_rate": Tolerance(True, 0.01, relative=False),
+    "avg_hit_score": Tolerance(True, 0.02, relative=False),
+    "avg_time_ms": Tolerance(False, 0.25, floor=0.05),
+    "p50_ms": Tolerance(False, 0.25, floor=0.05),
+    "p95_ms": Tolerance(False, 0.35, floor=0.1),
+    "p99_ms": Tolerance(False, 0.5, floor=0.2),
+    "seconds": Tolerance(False, 0.25, floor=0.1),
+    "rows_per_s": Tolerance(True, 0.25),
+}
+"""
+Per metric name, relative tolerances are fractions of the baseline value. qps is left out, it is the
+inverse of avg_time_ms.
+"""
+ACCURACY = ("success_rate", "top1_rate", "avg_hit_score")
+"""Metrics that depend on the sampled entries, only comparable with a seeded baseline."""
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Linearly interpolated percentile of already sorted values."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method="inclusive")[pct - 1]
+
+
+def latency_stats(latencies_ms: list[float]) -> dict:
+    """Mean, p50/p95/p99 (ms) and queries per second of a list of latencies."""
+    if not latencies_ms:
+        return {}
+
+    ordered = sorted(latencies_ms)
+    return {
+        "avg_time_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "qps": round(len(ordered) / (sum(ordered) / 1000), 1),
+    }
+
+
+def sample_entries(registry: Registry, size: int, seed: int) -> tuple[list[DTO], dict]:
+    """A seeded sample of a registry (in id order) and a description of it to store with the results."""
+    entries = sorted(registry, key=lambda e: e.id)
+    sample = sorted(
+        random.Random(seed).sample(entries, min(size, len(entries))),
+        key=lambda e: e.id,
+    )
+    ids = ",".join(str(e.id) for e in sample)
+
+    return sample, {
+        "size": len(sample),
+        "of": len(entries),
+        "ids_sha1": hashlib.sha1(ids.encode()).hexdigest()[:12],
+    }
+
+
+def benchmark_search(
+    registry: Registry, sample: list[DTO], iterations: int, seed: int, limit: int
+) -> dict:
+    """
+    Search every sampled entry by its mangled name and one alt name. Each query's mangling is seeded
+    from (seed, entry id, iteration), so runs are reproducible across processes.
+    """
+    # warm caches so the first timed query doesn't pay for them
+    registry.search(sample[0].name, limit=limit)
+
+    latencies: list[float] = []
+    hits = top1 = 0
+    hit_scores = []
+
+    for i in range(iterations):
+        for entry in sample:
+            rng = random.Random(f"{seed}:{entry.id}:{i}")
+            queries = [entry.name]
+            if entry.alt_names:
+                queries.append(rng.choice(entry.alt_names))
+
+            for n, q in enumerate(queries):
+                mangled = mangle(q, seed=f"{seed}:{entry.id}:{i}:{n}")
+                start = time.perf_counter()
+                results = registry.search(mangled, limit=limit)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+                ranks = [r.id for r, _ in results]
+                if entry.id in ranks:
+                    hits += 1
+                    hit_scores.append(results[ranks.index(entry.id)][1])
+                    top1 += ranks[0] == entry.id
+
+    return {
+        "queries": len(latencies),
+        "success_rate": round(hits / len(latencies), 3),
+        "top1_rate": round(top1 / len(latencies), 3),
+        "avg_hit_score": round(statistics.fmean(hit_scores), 3) if hit_scores else 0.0,
+        **latency_stats(latencies),
+    }
+
+
+def benchmark_lookup(
+    kind: str, registry: Registry, sample: list[DTO], iterations: int, limit: int
+) -> dict:
+    """Time get(id=...) or filter(name=...) for every sampled entry, counting how often it is returned."""
+    if kind == "get":
+        lookup = lambda entry: [registry.get(id=entry.id)]
+    else:
+        lookup = lambda entry: registry.filter(name=entry.name, limit=limit)
+
+    lookup(sample[0])
+
+    latencies: list[float] = []
+    hits = 0
+    for _ in range(iterations):
+        for entry in sample:
+            start = time.perf_counter()
+            results = lookup(entry)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += any(r is not None and r.id == entry.id for r in results)
+
+    return {
+        "queries": len(latencies),
+        "success_rate": round(hits / len(latencies), 3),
+        **latency_stats(latencies),
+    }
+
+
+def environment() -> dict:
+    try:
+        version = metadata.version("localis")
+    except metadata.PackageNotFoundError:
+        version = "dev"
+
+    return {
+        "localis": version,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "machine": platform.machine(),
     }
-    results["notes"] = input("Notes: ")
 
-    for registry_name in registries:
+
+def benchmark(args: argparse.Namespace) -> dict:
+    results: dict = {}
+
+    for registry_name in args.registries:
         print(f"Starting {registry_name}...")
         registry: Registry = getattr(localis, registry_name)
-        entries: list[DTO] = list(registry)
+        sample, sample_info = sample_entries(registry, args.sample_size, args.seed)
 
-        total_queries = 0
-        num_hit = 0
-        num_miss = 0
-        avg_time = 0.0
-        top_scores = []
+        if "search" in args.benchmarks:
+            results[registry_name] = {
+                **benchmark_search(
+                    registry, sample, args.iterations, args.seed, args.limit
+                ),
+                "sample": sample_info,
+            }
+        for kind in ("get", "filter"):
+            if kind in args.benchmarks:
+                results.setdefault(kind, {})[registry_name] = benchmark_lookup(
+                    kind, registry, sample, args.iterations, args.limit
+                )
 
-        def search(q: str):
-            nonlocal total_queries, num_hit, num_miss, avg_time
+    # last, it reconnects the database while it runs
+    if "load" in args.benchmarks and args.load_tsv:
+        print("Starting load...")
+        results["load"] = benchmark_load(args.load_tsv, [os.cpu_count() or 1])
 
-            seed = hash((entry.id, i))
-            mangled_q = mangle(q, seed=seed)
-            start = time.perf_counter()
-            search_results = registry.search(mangled_q, limit=15)
-            end = time.perf_counter()
-            elapsed = (end - start) * 1000
-
-            if total_queries == 0:
-                avg_time = elapsed
-            else:
-                avg_time = (avg_time * total_queries + elapsed) / (total_queries + 1)
-
-            total_queries += 1
-
-            for r, score in search_results:
-                if entry.id == r.id:
-                    num_hit += 1
-                    top_scores.append(score)
-                else:
-                    num_miss += 1
-
-        # BEGIN SEARCHES
-        for i in range(ITERATIONS):
-            print(f"Pass {i}")
-            for entry in entries[:SAMPLE_SIZE]:
-                search(entry.name)
-                if entry.alt_names:
-                    rand_alt_name = random.Random(42 + i).choice(entry.alt_names)
-                    search(rand_alt_name)
-
-        success_rate = num_hit / total_queries if total_queries else 0.0
-        avg_hit_score = sum(top_scores) / num_hit
-
-        results[registry_name] = {
-            "success_rate": round(success_rate, 3),
-            "avg_time_ms": round(avg_time, 3),
-            "avg_hit_score": round(avg_hit_score, 3),
-        }
     return results
 
 
-def write_file(results: dict):
+def flatten(
+    results: dict, tolerances: dict[str, Tolerance] = TOLERANCES, prefix: str = ""
+) -> dict[str, float]:
+    """Metrics of a result entry that have a tolerance, keyed by dotted path, e.g. get.cities.p95_ms."""
+    metrics = {}
+    for key, value in results.items():
+        if key in ("environment", "sample", *SETTINGS):
+            continue
+        if isinstance(value, dict):
+            metrics.update(flatten(value, tolerances, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and key in tolerances:
+            metrics[f"{prefix}{key}"] = value
+    return metrics
 
-    file_path = "tests/search_benchmarks.json"
-    now_key = datetime.now().isoformat()
 
-    # load existing data if file exists
+def compare(
+    baseline: dict, current: dict, tolerances: dict[str, Tolerance] = TOLERANCES
+) -> list[dict]:
+    """Metrics present in both entries, each with its change and whether it regressed."""
+    base, new = flatten(baseline, tolerances), flatten(current, tolerances)
+    rows = []
+    for path in base.keys() & new.keys():
+        tol = tolerances[path.rsplit(".", 1)[-1]]
+        before, after = base[path], new[path]
+
+        # signed so that a positive change is always an improvement
+        delta = after - before if tol.higher_is_better else before - after
+        change = delta / before if tol.relative and before else delta
+
+        rows.append(
+            {
+                "metric": path,
+                "baseline": before,
+                "current": after,
+                "change": round(change, 3),
+                "regressed": change < -tol.limit and -delta > tol.floor,
+            }
+        )
+
+    return sorted(rows, key=lambda r: r["metric"])
+
+
+def print_comparison(rows: list[dict], baseline_key: str) -> None:
+    print(f"\nCompared with {baseline_key} (change: + better, - worse)")
+    for row in rows:
+        flag = "REGRESSED" if row["regressed"] else ""
+        print(
+            f"{row['metric']:<32} {row['baseline']:>12} {row['current']:>12} {row['change']:>+9.3f}  {flag}"
+        )
+
+
+def find_baseline(all_results: dict, key: str) -> str:
+    """The entry key matching key exactly, else the latest one starting with it ("latest": any)."""
+    if key in all_results:
+        return key
+
+    prefix = "" if key == "latest" else key
+    matches = sorted(k for k in all_results if k.startswith(prefix))
+    if not matches:
+        raise SystemExit(f"No benchmark entry matches {key!r}")
+    return matches[-1]
+
+
+def read_file(file_path: Path = RESULTS_FILE) -> dict:
     try:
         with open(file_path, "r") as f:
-            all_results = json.load(f)
+            return json.load(f)
     except (FileNotFoundError, json.JSONDecodeError):
-        all_results = {}
+        return {}
+
 
-    # add the new benchmark under the current datetime key
+def write_file(results: dict, file_path: Path = RESULTS_FILE) -> str:
+    """Add results under the current datetime key, returning the key."""
+    now_key = datetime.now().isoformat()
+
+    all_results = read_file(file_path)
     all_results[now_key] = results
 
-    # write back the updated object
     with open(file_path, "w") as f:
         json.dump(all_results, f, indent=4)
 
+    return now_key
+
+
+def parse_tolerance(value: str) -> tuple[str, float]:
+    metric, _, limit = value.partition("=")
+    return metric, float(limit)
 
-def main():
-    results = benchmark()
+
+def gate(
+    baseline_key: str,
+    baseline: dict,
+    results: dict,
+    tolerances: dict[str, Tolerance],
+    overrides: list[tuple[str, float]] = (),
+) -> None:
+    """Print the comparison with the baseline entry, exiting with 1 if any metric regressed."""
+    tolerances = dict(tolerances)
+    for metric, limit in overrides:
+        if metric not in tolerances:
+            raise SystemExit(
+                f"Unknown metric {metric!r}, expected one of: {', '.join(tolerances)}"
+            )
+        tolerances[metric] = tolerances[metric]._replace(limit=limit)
+
+    rows = compare(baseline, results, tolerances)
+    print_comparison(rows, baseline_key)
+    if any(row["regressed"] for row in rows):
+        sys.exit(1)
+
+
+def add_common_args(
+    parser: argparse.ArgumentParser,
+    tolerances: dict[str, Tolerance],
+    results_file: Path,
+) -> None:
+    """The options to store results or compare them with a stored entry, shared by every benchmark script."""
+    parser.add_argument("--notes", default="", help="Stored with the results.")
+    parser.add_argument("--output", type=Path, default=results_file)
+    parser.add_argument(
+        "--no-save", action="store_true", help="Print the results without storing them."
+    )
+    parser.add_argument(
+        "--compare",
+        nargs="?",
+        const="latest",
+        default=None,
+        metavar="KEY",
+        help="Compare with a stored entry (key or key prefix, default: latest) instead of storing, "
+        "exiting with 1 on regressions. Settings not given are taken from that entry.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=parse_tolerance,
+        action="append",
+        default=[],
+        metavar="METRIC=LIMIT",
+        help=f"Override a tolerance, metrics: {', '.join(tolerances)}.",
+    )
+
+
+def run(
+    args: argparse.Namespace,
+    benchmark: Callable[[argparse.Namespace], dict],
+    settings: dict,
+    tolerances: dict[str, Tolerance],
+    skip_metrics: Callable[[dict], tuple[str, ...]] | None = None,
+) -> None:
+    """
+    Run a benchmark script parsed with add_common_args: settings left as None are taken from the
+    --compare baseline (else their defaults), then the results are printed and either stored or gated
+    against the baseline. skip_metrics(baseline) names metrics not comparable with that baseline.
+    """
+    baseline_key = baseline = None
+    if args.compare:
+        all_results = read_file(args.output)
+        baseline_key = find_baseline(all_results, args.compare)
+        baseline = all_results[baseline_key]
+
+    for key, default in settings.items():
+        if getattr(args, key) is None:
+            setattr(args, key, (baseline or {}).get(key, default))
+
+    results = {
+        **{key: getattr(args, key) for key in settings},
+        "notes": args.notes,
+        "environment": environment(),
+        **benchmark(args),
+    }
     print(json.dumps(results, indent=4))
-    results["report"] = input("Report: ")
-    write_file(results)
+
+    if baseline is None:
+        if not args.no_save:
+            print(f"Saved as {write_file(results, args.output)} in {args.output}")
+        return
+
+    skipped = skip_metrics(baseline) if skip_metrics else ()
+    tolerances = {k: v for k, v in tolerances.items() if k not in skipped}
+    overrides = [
+        (metric, limit) for metric, limit in args.tolerance if metric not in skipped
+    ]
+    gate(baseline_key, baseline, results, tolerances, overrides)
+
+
+def unseeded(baseline: dict) -> tuple[str, ...]:
+    """The accuracy metrics when the baseline predates seeded sampling."""
+    if "seed" in baseline:
+        return ()
+    print("Baseline predates seeded sampling, accuracy is not compared.")
+    return ACCURACY
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Search, lookup and load benchmarks, run as: python -m tests.analysis.benchmarks"
+    )
+    parser.add_argument(
+        "--registries", nargs="+", choices=REGISTRIES, default=REGISTRIES
+    )
+    parser.add_argument(
+        "--benchmarks",
+        nargs="+",
+        choices=BENCHMARKS,
+        default=BENCHMARKS,
+        help="load only runs with --load-tsv.",
+    )
+    parser.add_argument("--iterations", type=int, default=None)
+    parser.add_argument("--sample", dest="sample_size", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument(
+        "--load-tsv", type=Path, default=None, help="Cities TSV for the load benchmark."
+    )
+    add_common_args(parser, TOLERANCES, RESULTS_FILE)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    run(parse_args(argv), benchmark, SETTINGS, TOLERANCES, unseeded)
 
 
 if __name__ == "__main__":
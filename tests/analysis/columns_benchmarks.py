@@ -0,0 +1,50 @@
+import json
+import time
+import tracemalloc
+import localis
+from localis.registries import Registry
+
+REGISTRIES = ["countries", "subdivisions", "cities"]
+
+
+def measure(fn) -> dict:
+    """Times a run, then traces a second run for peak memory (tracing skews timing)."""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(elapsed, 3), "peak_mb": round(peak / 1024**2, 1)}
+
+
+def benchmark():
+    results = {}
+
+    for registry_name in REGISTRIES:
+        print(f"Starting {registry_name}...")
+        registry: Registry = getattr(localis, registry_name)
+
+        def dto_path():
+            registry._cache = None  # measure a cold cache, as on first iteration
+            return [r.to_dict() for r in registry]
+
+        results[registry_name] = {
+            "rows": registry.count,
+            "to_dict": measure(dto_path),
+            "to_columns": measure(registry.to_columns),
+        }
+        registry._cache = None
+
+    return results
+
+
+def main():
+    results = benchmark()
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import json
+import time
+import localis
+from localis.data import CityModel
+
+ITERATIONS = 5
+
+SUBDIVISIONS = ["US-CA", "IN-UP", "US-TX", "CN-SD"]
+COUNTRIES = ["US", "IN", "CN"]
+
+
+def timed(fn) -> tuple[float, int]:
+    """Returns the best time (ms) over ITERATIONS runs and the result count."""
+    best = None
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        results = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 3), len(results)
+
+
+def fts_for_subdivision(sub: localis.Subdivision) -> list[localis.City]:
+    """The FTS match + python filtering path replaced by the hierarchy index."""
+    sub_field = "|".join([sub.name, sub.geonames_code or "", sub.iso_code or ""])
+    results = CityModel.select(CityModel.admin1 == sub_field)
+    if not results:
+        results = CityModel.select(CityModel.admin2 == sub_field)
+    return [
+        r.to_dto() for r in results if r.admin1 == sub_field or r.admin2 == sub_field
+    ]
+
+
+def fts_for_country(country: localis.Country) -> list[localis.City]:
+    country_field = "|".join([country.name, country.alpha2, country.alpha3])
+    return [r.to_dto() for r in CityModel.select(CityModel.country == country_field)]
+
+
+def benchmark():
+    results = {"iterations": ITERATIONS, "for_subdivision": {}, "for_country": {}}
+
+    for iso_code in SUBDIVISIONS:
+        sub = localis.subdivisions.get(iso_code=iso_code)
+        if sub is None:
+            continue
+        fts_ms, fts_count = timed(lambda: fts_for_subdivision(sub))
+        idx_ms, idx_count = timed(
+            lambda: localis.cities.for_subdivision(iso_code=iso_code)
+        )
+        results["for_subdivision"][iso_code] = {
+            "cities": idx_count,
+            "fts_ms": fts_ms,
+            "index_ms": idx_ms,
+            "fts_count_matches": fts_count == idx_count,
+        }
+
+    for alpha2 in COUNTRIES:
+        country = localis.countries.get(alpha2=alpha2)
+        fts_ms, fts_count = timed(lambda: fts_for_country(country))
+        idx_ms, idx_count = timed(lambda: localis.cities.for_country(alpha2=alpha2))
+        results["for_country"][alpha2] = {
+            "cities": idx_count,
+            "fts_ms": fts_ms,
+            "index_ms": idx_ms,
+            "fts_count_matches": fts_count == idx_count,
+        }
+
+    return results
+
+
+def main():
+    results = benchmark()
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
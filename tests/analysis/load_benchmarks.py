@@ -0,0 +1,49 @@
+import argparse
+import json
+import os
+import tempfile
+from pathlib import Path
+from localis.data import db, CityModel
+
+DEFAULT_TSV = Path(__file__).parents[2] / "data/cities/cities.tsv"
+
+
+def benchmark(tsv: Path, worker_counts: list[int]) -> dict:
+    """Time a serial CityModel.load against load_parallel, each into a fresh database."""
+    results = {"tsv": str(tsv), "cpus": os.cpu_count()}
+
+    with tempfile.TemporaryDirectory(prefix="localis-bench-") as tmp:
+        runs = {"serial": None, **{f"workers={n}": n for n in worker_counts}}
+        for name, workers in runs.items():
+            with db.use(str(Path(tmp) / f"{name}.db")):
+                if workers is None:
+                    with open(tsv, newline="", encoding="utf-8") as f:
+                        metrics = CityModel.load(f)
+                else:
+                    metrics = CityModel.load_parallel(tsv, workers)
+
+            results[name] = {
+                "rows": metrics.rows,
+                "seconds": round(metrics.seconds, 3),
+                "rows_per_s": round(metrics.rows_per_second),
+            }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tsv", type=Path, default=DEFAULT_TSV)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({2, os.cpu_count() or 1}),
+    )
+    args = parser.parse_args()
+
+    print(json.dumps(benchmark(args.tsv, args.workers), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import argparse
+import gc
+import os
+import statistics
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from localis.data import db, CityModel
+from localis.registries import Registry
+import localis
+from tests.utils import mangle
+from tests.analysis.benchmarks import (
+    REGISTRIES,
+    Tolerance,
+    add_common_args,
+    percentile,
+    run,
+    sample_entries,
+)
+
+SAMPLE_SIZE = 100
+SEED = 42
+LIMIT = 15
+RESULTS_FILE = Path(__file__).parent / "memory_benchmarks.json"
+SETTINGS = {"sample_size": SAMPLE_SIZE, "seed": SEED, "limit": LIMIT}
+
+MB = 1024 * 1024
+
+TOLERANCES = {
+    "retained_mb": Tolerance(False, 0.1, floor=1.0),
+    "peak_mb": Tolerance(False, 0.15, floor=1.0),
+    "rss_mb": Tolerance(False, 0.25, floor=5.0),
+    "peak_kb_p50": Tolerance(False, 0.25, floor=16.0),
+    "peak_kb_p95": Tolerance(False, 0.25, floor=32.0),
+    "peak_kb_max": Tolerance(False, 0.5, floor=64.0),
+}
+"""
+tracemalloc counts python allocations only. rss_mb (resident set growth over a stage) also covers
+sqlite's page cache and rapidfuzz, but is coarse: memory freed back to the allocator rarely shrinks it.
+"""
+
+
+def rss_mb() -> float | None:
+    """Current resident set size, None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (FileNotFoundError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / MB
+
+
+@contextmanager
+def rss_growth():
+    """Resident set growth (MB) over a block, filled into the yielded dict as rss_mb on exit."""
+    gc.collect()
+    usage = {}
+    before = rss_mb()
+    yield usage
+    after = rss_mb()
+    usage["rss_mb"] = round(after - before, 1) if before is not None else None
+
+
+@contextmanager
+def traced():
+    """
+    Trace python allocations over a block, filling the yielded dict with the bytes still held
+    (retained) and the peak on exit. Only allocations made inside the block are counted.
+    """
+    gc.collect()
+    usage = {}
+    tracemalloc.start()
+    try:
+        yield usage
+        usage["retained"], usage["peak"] = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+
+def measure_cache(registry: Registry) -> dict:
+    """Python memory held by registry.cache once built and the peak while building it, then RSS growth."""
+    registry._cache = None
+    with traced() as mem:
+        entries = len(registry.cache)
+
+    # tracemalloc's own bookkeeping per live object would inflate the resident size, measure untraced
+    registry._cache = None
+    with rss_growth() as rss:
+        registry.cache
+
+    return {
+        "entries": entries,
+        "retained_mb": round(mem["retained"] / MB, 2),
+        "peak_mb": round(mem["peak"] / MB, 2),
+        "bytes_per_entry": round(mem["retained"] / entries) if entries else 0,
+        **rss,
+    }
+
+
+def measure_search(registry: Registry, sample_size: int, seed: int, limit: int) -> dict:
+    """Peak python allocations of single search calls over a seeded sample of mangled names."""
+    sample, sample_info = sample_entries(registry, sample_size, seed)
+    registry.search(sample[0].name, limit=limit)
+
+    peaks = []
+    for entry in sample:
+        query = mangle(entry.name, seed=f"{seed}:{entry.id}:0:0")
+        with traced() as mem:
+            registry.search(query, limit=limit)
+        peaks.append(mem["peak"] / 1024)
+
+    ordered = sorted(peaks)
+    return {
+        "queries": len(ordered),
+        "peak_kb_p50": round(percentile(ordered, 50), 1),
+        "peak_kb_p95": round(percentile(ordered, 95), 1),
+        "peak_kb_max": round(ordered[-1], 1),
+        "peak_kb_avg": round(statistics.fmean(ordered), 1),
+        "sample": sample_info,
+    }
+
+
+def measure_load(tsv: Path) -> dict:
+    """Peak python allocations and RSS growth of a serial CityModel.load into a fresh database."""
+    with tempfile.TemporaryDirectory(prefix="localis-bench-") as tmp:
+        with db.use(str(Path(tmp) / "cities.db")):
+            with rss_growth() as rss, traced() as mem:
+                with open(tsv, newline="", encoding="utf-8") as f:
+                    metrics = CityModel.load(f)
+
+    return {"rows": metrics.rows, "peak_mb": round(mem["peak"] / MB, 2), **rss}
+
+
+def benchmark(args: argparse.Namespace) -> dict:
+    results: dict = {}
+
+    # first, while freed cache memory doesn't hide its resident growth yet
+    if args.load_tsv:
+        print("Starting load...")
+        results["load"] = measure_load(args.load_tsv)
+
+    for registry_name in args.registries:
+        print(f"Starting {registry_name}...")
+        registry: Registry = getattr(localis, registry_name)
+        results.setdefault("cache", {})[registry_name] = measure_cache(registry)
+        results.setdefault("search", {})[registry_name] = measure_search(
+            registry, args.sample_size, args.seed, args.limit
+        )
+
+    return results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Memory benchmarks, run as: python -m tests.analysis.memory_benchmarks"
+    )
+    parser.add_argument(
+        "--registries", nargs="+", choices=REGISTRIES, default=REGISTRIES
+    )
+    parser.add_argument("--sample", dest="sample_size", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument(
+        "--load-tsv", type=Path, default=None, help="Cities TSV to measure a load with."
+    )
+    add_common_args(parser, TOLERANCES, RESULTS_FILE)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    run(parse_args(argv), benchmark, SETTINGS, TOLERANCES)
+
+
+if __name__ == "__main__":
+    main()
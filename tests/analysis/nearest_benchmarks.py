@@ -0,0 +1,55 @@
+import json
+import random
+import time
+import localis
+
+SAMPLE_SIZE = 2000
+SEED = 42
+
+
+def benchmark():
+    rng = random.Random(SEED)
+    columns = localis.cities.to_columns(["lat", "lng"])
+    n = len(columns["lat"])
+
+    start = time.perf_counter()
+    localis.cities._spatial_index
+    build_s = time.perf_counter() - start
+
+    # jitter real city coordinates by up to ~10km
+    points = [
+        (
+            columns["lat"][i] + rng.uniform(-0.1, 0.1),
+            max(-180, min(180, columns["lng"][i] + rng.uniform(-0.1, 0.1))),
+        )
+        for i in (rng.randrange(n) for _ in range(SAMPLE_SIZE))
+    ]
+    points = [(max(-90, min(90, lat)), lng) for lat, lng in points]
+
+    results = {"cities": n, "sample_size": SAMPLE_SIZE, "build_s": round(build_s, 3)}
+    grid = localis.cities._spatial_index
+    for k, min_population in [(1, None), (10, None), (1, 100000)]:
+        start = time.perf_counter()
+        for lat, lng in points:
+            grid.nearest(lat, lng, k, min_population)
+        index_ms = (time.perf_counter() - start) * 1000 / SAMPLE_SIZE
+
+        start = time.perf_counter()
+        for lat, lng in points:
+            localis.cities.nearest(lat, lng, k, min_population)
+        total_ms = (time.perf_counter() - start) * 1000 / SAMPLE_SIZE
+
+        results[f"k={k},min_population={min_population}"] = {
+            "index_avg_ms": round(index_ms, 4),
+            "with_dtos_avg_ms": round(total_ms, 4),
+        }
+
+    return results
+
+
+def main():
+    print(json.dumps(benchmark(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import json
+import os
+import time
+import numpy as np
+import localis
+
+SIZES = [10_000, 100_000, 1_000_000]
+SEED = 42
+
+
+def sample_points(size: int, rng: np.random.Generator) -> tuple:
+    """Half jittered real city coordinates (~10km), half uniform over land-ish latitudes."""
+    columns = localis.cities.to_columns(["lat", "lng"], backend="numpy")
+    near = rng.integers(0, len(columns["lat"]), size // 2)
+    lats = np.concatenate(
+        [
+            columns["lat"][near] + rng.uniform(-0.1, 0.1, len(near)),
+            rng.uniform(-60, 75, size - len(near)),
+        ]
+    )
+    lngs = np.concatenate(
+        [
+            columns["lng"][near] + rng.uniform(-0.1, 0.1, len(near)),
+            rng.uniform(-180, 180, size - len(near)),
+        ]
+    )
+    return np.clip(lats, -90, 90), np.clip(lngs, -180, 180)
+
+
+def benchmark():
+    rng = np.random.default_rng(SEED)
+
+    start = time.perf_counter()
+    localis.cities.nearest_many([0.0], [0.0])
+    build_s = time.perf_counter() - start
+
+    workers = os.cpu_count() or 1
+    results = {"cities": localis.cities.count, "build_s": round(build_s, 3)}
+    for size in SIZES:
+        lats, lngs = sample_points(size, rng)
+        runs = {}
+        for n_workers in sorted({1, workers}):
+            start = time.perf_counter()
+            localis.cities.nearest_many(lats, lngs, workers=n_workers)
+            elapsed = time.perf_counter() - start
+            runs[f"workers={n_workers}"] = {
+                "seconds": round(elapsed, 3),
+                "points_per_s": round(size / elapsed),
+            }
+        results[f"points={size}"] = runs
+
+    return results
+
+
+def main():
+    print(json.dumps(benchmark(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
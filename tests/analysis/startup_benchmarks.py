@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from tests.analysis.benchmarks import Tolerance, add_common_args, run
+
+RUNS = 5
+TOP_MODULES = 15
+RESULTS_FILE = Path(__file__).parent / "startup_benchmarks.json"
+SETTINGS = {"runs": RUNS, "fresh_cache": False}
+
+PROBE = """
+import json, time
+
+start = last = time.perf_counter()
+stages = {}
+
+def stage(name):
+    global last
+    now = time.perf_counter()
+    stages[name] = round((now - last) * 1000, 3)
+    last = now
+
+import localis
+stage("import_ms")
+localis.countries.get(alpha2="US")
+stage("first_country_get_ms")
+localis.subdivisions.search("bavaria")
+stage("first_subdivision_search_ms")
+try:
+    localis.cities.search("munich")
+    stage("first_city_search_ms")
+except RuntimeError:
+    pass  # cities not loaded
+
+stages["total_ms"] = round((time.perf_counter() - start) * 1000, 3)
+print(json.dumps(stages))
+"""
+"""Timed in a fresh interpreter, each stage on its own, plus the total since the import started."""
+
+STAGES = [
+    "import_ms",
+    "first_country_get_ms",
+    "first_subdivision_search_ms",
+    "first_city_search_ms",
+    "total_ms",
+]
+
+TOLERANCES = {name: Tolerance(False, 0.25, floor=5.0) for name in STAGES}
+TOLERANCES["localis_import_ms"] = Tolerance(False, 0.25, floor=5.0)
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s+(\S+)")
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[float, float]]:
+    """(self_ms, cumulative_ms) per module from `python -X importtime` output."""
+    modules = {}
+    for match in _IMPORT_LINE.finditer(stderr):
+        self_us, cumulative_us, module = match.groups()
+        modules[module] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+    return modules
+
+
+def run_probe(fresh_cache: bool) -> tuple[dict, dict]:
+    """Run the probe in a new interpreter, returning its stage timings and per module import times."""
+    env = dict(os.environ)
+    with tempfile.TemporaryDirectory(prefix="localis-cache-") as cache_dir:
+        if fresh_cache:
+            env["LOCALIS_CACHE_DIR"] = cache_dir
+
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE],
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        )
+
+    return json.loads(proc.stdout.strip().splitlines()[-1]), parse_importtime(
+        proc.stderr
+    )
+
+
+def benchmark(args: argparse.Namespace) -> dict:
+    results: dict = {}
+
+    runs = [run_probe(args.fresh_cache) for _ in range(args.runs)]
+    stages = [name for name in STAGES if all(name in r[0] for r in runs)]
+    results["median"] = {
+        name: round(statistics.median(r[0][name] for r in runs), 1) for name in stages
+    }
+    results["min"] = {name: round(min(r[0][name] for r in runs), 1) for name in stages}
+
+    # median self and cumulative time of every module imported in all runs
+    module_names = set.intersection(*(set(r[1]) for r in runs))
+    modules = {
+        name: (
+            statistics.median(r[1][name][0] for r in runs),
+            statistics.median(r[1][name][1] for r in runs),
+        )
+        for name in module_names
+    }
+    results["imports"] = {
+        "modules": len(modules),
+        "localis_import_ms": round(modules.get("localis", (0, 0))[1], 1),
+        "slowest": {
+            name: {"self_ms": round(self_ms, 2), "cumulative_ms": round(cumul_ms, 2)}
+            for name, (self_ms, cumul_ms) in sorted(
+                modules.items(), key=lambda item: -item[1][0]
+            )[: args.top]
+        },
+    }
+
+    return results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Import time and cold start benchmarks, run as: python -m tests.analysis.startup_benchmarks"
+    )
+    parser.add_argument("--runs", type=int, default=None)
+    parser.add_argument(
+        "--top", type=int, default=TOP_MODULES, help="Modules listed by self time."
+    )
+    parser.add_argument(
+        "--fresh-cache",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Give every run an empty user cache dir, timing a first start after a wheel install.",
+    )
+    add_common_args(parser, TOLERANCES, RESULTS_FILE)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    run(parse_args(argv), benchmark, SETTINGS, TOLERANCES)
+
+
+if __name__ == "__main__":
+    main()
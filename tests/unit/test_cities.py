@@ -17,6 +17,18 @@ class TestGet:
         assert getattr(result, field) == value, f"Result: {result}, {field}: {value}"
 
 
+class TestGetMany:
+    """GET_MANY"""
+
+    def test_geonames_id(self, city: City, select_random):
+        """should fetch many cities by geonames_id in input order"""
+        other = select_random(cities, 1)
+        ids = [city.geonames_id, 0, str(other.geonames_id)]
+        results = cities.get_many(geonames_id=ids)
+
+        assert results == [city, None, other]
+
+
 class TestFilter:
     """FILTER"""
 
@@ -133,3 +145,506 @@ class TestForSubdivision:
             assert all(city.population < r.population for r in results)
         elif "__lt" in filter:
             assert all(city.population > r.population for r in results)
+
+    def test_admin2(self, city: City, select_random):
+        """should return the cities of an admin2 subdivision"""
+
+        i = 1
+        while len(city.subdivisions) < 2:
+            city = select_random(cities, i)
+            i += 1
+
+        admin2 = city.subdivisions[1]
+        results = cities.for_subdivision(geonames_code=admin2.geonames_code)
+
+        assert city in results
+        assert all(
+            r.subdivisions[1].geonames_code == admin2.geonames_code for r in results
+        )
+
+    def test_population_order(self, sub: Subdivision):
+        """should order results by population, largest first"""
+
+        results = cities.for_subdivision(id=sub.id)
+
+        assert all(a.population >= b.population for a, b in zip(results, results[1:]))
+
+
+class TestSearchNear:
+    """SEARCH NEAR"""
+
+    def test_near(self, city: City):
+        """should find the city near its own coordinates, equal scores ordered by distance"""
+        from localis.spatial import haversine
+
+        results = cities.search(city.name, near=(city.lat, city.lng))
+        distances = [haversine(city.lat, city.lng, c.lat, c.lng) for c, _ in results]
+
+        assert city in [c for c, _ in results]
+        assert all(
+            (s1 > s2) or (s1 == s2 and d1 <= d2)
+            for (_, s1), (_, s2), d1, d2 in zip(
+                results, results[1:], distances, distances[1:]
+            )
+        )
+
+    def test_widens(self, city: City):
+        """should widen to a global search when nothing matches nearby"""
+        lat, lng = -city.lat, city.lng - 180 if city.lng > 0 else city.lng + 180
+        results = cities.search(city.name, limit=5, near=(lat, lng))
+
+        assert len(results) > 0
+
+    def test_weak_local_match(self, city: City, tmp_path):
+        """should widen past a weak nearby match to an exact one further away"""
+        from localis.data import CityModel
+
+        model = CityModel.get_by_id(city.id)
+        admin = [model.admin1, model.admin2, model.country]
+        exact = ["upsert", "999999998", "Zyxwqville", "", *admin, 5, 40.0, 20.0]
+        weak = ["upsert", "999999999", "Zyxwq", "", *admin, 5, -40.0, -100.0]
+        delta = TestApplyDelta()
+
+        cities.apply_delta(delta.write(tmp_path, [exact, weak]))
+        try:
+            results = cities.search("Zyxwqville", near=(-40.0, -100.0))
+        finally:
+            deletes = [["delete", id, *[""] * 8] for id in ("999999998", "999999999")]
+            cities.apply_delta(delta.write(tmp_path, deletes))
+
+        assert [c.name for c, _ in results] == ["Zyxwqville", "Zyxwq"]
+
+    def test_invalid(self, city: City):
+        """should raise a ValueError for invalid coordinates"""
+        with pytest.raises(ValueError):
+            cities.search(city.name, near=(91, 0))
+
+
+class TestNearest:
+    """NEAREST"""
+
+    def test_self(self, city: City):
+        """should return a city at distance 0 from its own coordinates"""
+
+        results = cities.nearest(city.lat, city.lng, k=5)
+        nearest, distance = results[0]
+
+        assert distance == pytest.approx(0, abs=1e-6)
+        assert city in [c for c, d in results if d == distance]
+
+    def test_brute_force(self, city: City):
+        """should match a brute-force scan over every city"""
+        from localis.spatial import haversine
+
+        lat, lng = city.lat + 0.3, city.lng - 0.3
+        columns = cities.to_columns(["lat", "lng", "population"])
+        distances = sorted(
+            haversine(lat, lng, la, ln)
+            for la, ln, pop in zip(
+                columns["lat"], columns["lng"], columns["population"]
+            )
+            if pop >= city.population
+        )
+
+        results = cities.nearest(lat, lng, k=3, min_population=city.population)
+
+        assert [d for _, d in results] == pytest.approx(distances[:3])
+        assert all(c.population >= city.population for c, _ in results)
+
+    def test_invalid(self):
+        """should raise a ValueError for invalid coordinates"""
+        with pytest.raises(ValueError):
+            cities.nearest(91, 0)
+
+
+class TestNearestMany:
+    """NEAREST MANY"""
+
+    def test_matches_nearest(self, city: City):
+        """should return the same city and distance as nearest() for every point"""
+        points = [(city.lat, city.lng), (city.lat + 0.5, city.lng - 0.5), (-80, 170)]
+        ids, distances = cities.nearest_many(
+            [lat for lat, _ in points], [lng for _, lng in points]
+        )
+
+        assert len(ids) == len(distances) == len(points)
+        for (lat, lng), id, distance in zip(points, ids, distances):
+            [(nearest, expected)] = cities.nearest(lat, lng)
+            assert distance == pytest.approx(expected)
+            assert cities.get(id=int(id)).lat == nearest.lat
+
+    def test_workers(self, city: City):
+        """should return the same results when split across worker processes"""
+        np = pytest.importorskip("numpy")
+        lats = np.linspace(-60, 70, 50)
+        lngs = np.linspace(-170, 170, 50)
+
+        ids, distances = cities.nearest_many(lats, lngs)
+        p_ids, p_distances = cities.nearest_many(lats, lngs, workers=2)
+
+        assert list(ids) == list(p_ids)
+        assert list(distances) == list(p_distances)
+
+    def test_invalid(self):
+        """should raise a ValueError for mismatched or invalid coordinates"""
+        with pytest.raises(ValueError):
+            cities.nearest_many([0, 1], [0])
+        with pytest.raises(ValueError):
+            cities.nearest_many([91], [0])
+
+
+class TestWithinRadius:
+    """WITHIN_RADIUS"""
+
+    def test_radius(self, city: City):
+        """should return cities within the radius, nearest first"""
+        from localis.spatial import haversine
+
+        results = cities.within_radius(city.lat, city.lng, 50)
+
+        assert city in [c for c, _ in results]
+        assert all(d <= 50 for _, d in results)
+        assert all(a[1] <= b[1] for a, b in zip(results, results[1:]))
+        assert all(
+            haversine(city.lat, city.lng, c.lat, c.lng) == pytest.approx(d)
+            for c, d in results
+        )
+
+    def test_matches_nearest(self, city: City):
+        """should agree with nearest() on the cities in range"""
+        nearest = cities.nearest(city.lat + 0.2, city.lng, k=5)
+        km = nearest[-1][1]
+
+        results = cities.within_radius(city.lat + 0.2, city.lng, km)
+
+        assert [d for _, d in results][:5] == pytest.approx([d for _, d in nearest])
+
+    def test_population_order(self, city: City):
+        """should order by population and respect the limit"""
+        results = cities.within_radius(
+            city.lat, city.lng, 200, order_by="population", limit=3
+        )
+
+        assert len(results) <= 3
+        assert all(
+            a.population >= b.population for (a, _), (b, _) in zip(results, results[1:])
+        )
+
+
+class TestWithinBbox:
+    """WITHIN_BBOX"""
+
+    def test_bbox(self, city: City):
+        """should return cities inside the box, largest first"""
+        box = (city.lat - 1, city.lng - 1, city.lat + 1, city.lng + 1)
+        results = cities.within_bbox(*box)
+
+        assert city in results
+        assert all(
+            box[0] <= c.lat <= box[2] and box[1] <= c.lng <= box[3] for c in results
+        )
+        assert all(a.population >= b.population for a, b in zip(results, results[1:]))
+
+    def test_antimeridian(self):
+        """should wrap boxes crossing the antimeridian"""
+        results = cities.within_bbox(-90, 179, 90, -179, limit=50)
+
+        assert all(c.lng >= 179 or c.lng <= -179 for c in results)
+
+
+class TestGeohash:
+    """GEOHASH"""
+
+    def test_prefix_select(self, city: City):
+        """should select cities by geohash prefix through the model expression API"""
+        from localis.data import CityModel
+        from localis.spatial import geohash
+
+        prefix = geohash.encode(city.lat, city.lng, 5)
+        results = CityModel.select(CityModel.geohash.like(f"{prefix}%"))
+
+        assert city.id in [r.id for r in results]
+        assert all(r.geohash.startswith(prefix) for r in results)
+
+    def test_in_geohash(self, city: City):
+        """should return the cities of a cell, largest first, widened by its neighbours"""
+        from localis.spatial import geohash
+
+        cell = geohash.encode(city.lat, city.lng, 4)
+        results = cities.in_geohash(cell)
+        widened = cities.in_geohash(cell, neighbors=True)
+
+        assert city in results
+        assert all(geohash.encode(c.lat, c.lng, 4) == cell for c in results)
+        assert all(a.population >= b.population for a, b in zip(results, results[1:]))
+        assert {c.id for c in results} <= {c.id for c in widened}
+
+    @pytest.mark.parametrize("cell", ['9q"8', "9qa", ""])
+    def test_in_geohash_invalid(self, cell: str):
+        """should reject cells outside the geohash alphabet"""
+        with pytest.raises(ValueError):
+            cities.in_geohash(cell)
+
+
+class TestDistanceMatrix:
+    """DISTANCE MATRIX"""
+
+    def test_matrix(self, city: City):
+        """should return pairwise distances between two sets of city ids"""
+        from localis.spatial import haversine
+
+        others = cities.within_bbox(
+            city.lat - 5, city.lng - 5, city.lat + 5, city.lng + 5, limit=3
+        )
+        matrix = cities.distance_matrix([city.id], [c.id for c in others])
+
+        assert len(matrix) == 1 and len(matrix[0]) == len(others)
+        for j, other in enumerate(others):
+            assert matrix[0][j] == pytest.approx(
+                haversine(city.lat, city.lng, other.lat, other.lng)
+            )
+
+    def test_unknown_id(self, city: City):
+        """should raise a ValueError for unknown ids"""
+        with pytest.raises(ValueError):
+            cities.distance_matrix([city.id], [-1])
+
+
+class TestBinPopulation:
+    """BIN POPULATION"""
+
+    def test_totals(self, city: City):
+        """should preserve the total population and bin each city by its cell"""
+        bins = cities.bin_population(cell_deg=2)
+        total = sum(cities.to_columns(["population"])["population"])
+        cell = (
+            (city.lat + 90) // 2 * 2 - 90,
+            (city.lng + 180) % 360 // 2 * 2 - 180,
+        )
+
+        assert sum(bins.values()) == total
+        assert bins[cell] >= city.population
+
+
+class TestApplyDelta:
+    """APPLY DELTA"""
+
+    HEADERS = (
+        "action",
+        "geonames_id",
+        "name",
+        "alt_names",
+        "admin1",
+        "admin2",
+        "country",
+        "population",
+        "lat",
+        "lng",
+    )
+
+    def write(self, tmp_path, rows: list[list]):
+        path = tmp_path / "cities_delta.tsv"
+        lines = ["\t".join(self.HEADERS), *("\t".join(map(str, r)) for r in rows)]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+    def test_apply(self, city: City, tmp_path):
+        """should update, insert and delete cities by geonames_id, keeping ids and side tables in sync"""
+        from localis.data import CityModel
+
+        model = CityModel.get_by_id(city.id)
+        original = ["upsert", model.geonames_id, model.name, model.alt_names]
+        original += [model.admin1, model.admin2, model.country]
+        original += [model.population, model.lat, model.lng]
+        changed = [*original[:2], "Zzyzxville", *original[3:8], 10.0, 20.0]
+        new = ["upsert", "999999999", "Qwxplace", "", *original[4:7], 5, -10.0, -20.0]
+
+        list(cities)  # builds the cache a delta must drop
+
+        try:
+            counts = cities.apply_delta(self.write(tmp_path, [changed, new]))
+            assert counts == {"updated": 1, "inserted": 1, "deleted": 0}
+
+            updated = cities.get(id=city.id)
+            assert updated.name == "Zzyzxville"
+            assert cities.search("Zzyzxville", limit=1)[0][0].id == city.id
+            assert city.id in [c.id for c in cities.within_bbox(9.9, 19.9, 10.1, 20.1)]
+
+            inserted = cities.get(geonames_id="999999999")
+            assert inserted.name == "Qwxplace"
+            assert inserted in list(cities)
+            assert inserted.id in [
+                c.id for c in cities.within_bbox(-10.1, -20.1, -9.9, -19.9)
+            ]
+        finally:
+            delete = ["delete", "999999999", *[""] * 8]
+            counts = cities.apply_delta(self.write(tmp_path, [original, delete]))
+
+        assert counts == {"updated": 1, "inserted": 0, "deleted": 1}
+        assert cities.get(geonames_id="999999999") is None
+        assert "Qwxplace" not in [c.name for c in cities]
+        assert all(
+            c.geonames_id != 999999999
+            for c in cities.within_bbox(-10.1, -20.1, -9.9, -19.9)
+        )
+        assert cities.get(id=city.id) == city
+
+
+class TestLoadParallel:
+    """PARALLEL LOAD"""
+
+    COLUMNS = (
+        "geonames_id, name, alt_names, admin1, admin2, country, population, lat, lng"
+    )
+
+    def test_matches_serial(self, tmp_path):
+        """should load the same rows, ids and FTS index as a serial load"""
+        from localis.data import db, CityModel
+
+        rows = db.execute(
+            f"SELECT {self.COLUMNS} FROM cities ORDER BY rowid LIMIT 300"
+        ).fetchall()
+        tsv = tmp_path / "cities.tsv"
+        lines = [self.COLUMNS.replace(", ", "\t")]
+        lines += ["\t".join("" if v is None else str(v) for v in r) for r in rows]
+        tsv.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        def load(name: str, workers: int):
+            with db.use(str(tmp_path / name)):
+                metrics = CityModel.load_parallel(tsv, workers)
+                loaded = db.execute(
+                    f"SELECT rowid, {self.COLUMNS}, geohash FROM cities ORDER BY rowid"
+                ).fetchall()
+                matches = db.execute(
+                    "SELECT rowid FROM cities WHERE cities MATCH ? ORDER BY rowid",
+                    (f'name:"{rows[0][1]}"',),
+                ).fetchall()
+            return metrics, loaded, matches
+
+        serial = load("serial.db", 1)
+        parallel = load("parallel.db", 2)
+
+        assert serial[0].rows == parallel[0].rows == len(rows)
+        assert serial[1:] == parallel[1:]
+        assert parallel[2]
+
+
+class TestOldSchema:
+    """PRE-GEOHASH DATABASE"""
+
+    def test_search(self, city: City, tmp_path):
+        """should search and filter a cities table loaded before the geohash column existed"""
+        from localis.data import db, CityModel
+
+        columns = [c for c in CityModel.columns() if not c.startswith("geohash")]
+        names = [c.split()[0] for c in columns]
+        row = db.execute(
+            f"SELECT rowid, {', '.join(names)} FROM cities WHERE rowid = ?", (city.id,)
+        ).fetchone()
+
+        cities._clear_caches()
+        try:
+            with db.use(str(tmp_path / "old.db")):
+                db.create_fts_table(CityModel.table_name, columns)
+                db.execute(
+                    f"INSERT INTO cities (rowid, {', '.join(names)}) VALUES ({', '.join('?' * len(row))})",
+                    tuple(row),
+                )
+
+                assert cities.search(city.name)[0][0].id == city.id
+                assert city.id in [c.id for c in cities.filter(city.name)]
+                with pytest.raises(RuntimeError):
+                    cities.search(city.name, near=(city.lat, city.lng))
+        finally:
+            cities._clear_caches()
+
+
+class TestOpenFixture:
+    """STREAMING FIXTURE"""
+
+    TSV = "name\tpopulation\nZürich\t1\nSão Paulo\t2\n"
+
+    def read(self, url: str, sha256=None, cache_path=None) -> list[dict]:
+        import csv
+
+        with cities._open_fixture(url, sha256, cache_path) as (tsv, progress):
+            rows = list(csv.DictReader(tsv, delimiter="\t"))
+            progress(cities.PROGRESS_EVERY)
+        return rows
+
+    def test_file_url(self, tmp_path):
+        """should stream a file:// url as utf-8"""
+        path = tmp_path / "cities.tsv"
+        path.write_text(self.TSV, encoding="utf-8")
+
+        rows = self.read(path.as_uri())
+
+        assert [r["name"] for r in rows] == ["Zürich", "São Paulo"]
+
+    def test_http_url(self, tmp_path):
+        """should stream an http url as utf-8, even without a charset header"""
+        import threading
+        from functools import partial
+        from http.server import HTTPServer, SimpleHTTPRequestHandler
+
+        (tmp_path / "cities.tsv").write_text(self.TSV, encoding="utf-8")
+        handler = partial(SimpleHTTPRequestHandler, directory=str(tmp_path))
+        handler.log_message = lambda *args: None
+        server = HTTPServer(("127.0.0.1", 0), handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            rows = self.read(f"http://127.0.0.1:{server.server_port}/cities.tsv")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert [r["name"] for r in rows] == ["Zürich", "São Paulo"]
+
+    def test_checksum(self, tmp_path):
+        """should cache a verified copy and reject a mismatching checksum"""
+        import hashlib
+
+        path = tmp_path / "cities.tsv"
+        path.write_text(self.TSV, encoding="utf-8")
+        sha256 = hashlib.sha256(path.read_bytes()).hexdigest()
+        cache_path = tmp_path / "cache" / f"cities-{sha256}.tsv"
+
+        rows = self.read(str(path), sha256, cache_path)
+
+        assert len(rows) == 2
+        assert cache_path.read_bytes() == path.read_bytes()
+
+        bad_cache = tmp_path / "cache" / "cities-bad.tsv"
+        with pytest.raises(ValueError):
+            self.read(str(path), "0" * 64, bad_cache)
+        assert not bad_cache.exists()
+        assert list(bad_cache.parent.glob("*.tmp")) == []
+
+    def test_place_database(self, tmp_path):
+        """should copy a prebuilt database into place through a verified cache"""
+        import hashlib
+        import sqlite3
+
+        source = tmp_path / "cities.db"
+        with sqlite3.connect(source) as conn:
+            conn.execute("CREATE TABLE cities (name TEXT)")
+        sha256 = hashlib.sha256(source.read_bytes()).hexdigest()
+        cache_path = tmp_path / "cache" / f"cities-{sha256}.db"
+        path = tmp_path / "project" / "localis.db"
+
+        cities._place_database([source.as_uri()], sha256, cache_path, path)
+
+        assert path.read_bytes() == cache_path.read_bytes() == source.read_bytes()
+
+        bad_path = tmp_path / "bad" / "localis.db"
+        with pytest.raises(ValueError):
+            cities._place_database([str(source)], "0" * 64, None, bad_path)
+        assert list(bad_path.parent.iterdir()) == []
+
+    def test_user_cache_dir(self, monkeypatch, tmp_path):
+        """should honour the LOCALIS_CACHE_DIR override"""
+        from localis.utils import user_cache_dir
+
+        monkeypatch.setenv("LOCALIS_CACHE_DIR", str(tmp_path))
+        assert user_cache_dir() == tmp_path
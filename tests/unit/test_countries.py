@@ -15,6 +15,22 @@ class TestGet:
         assert getattr(result, field) == value
 
 
+class TestGetMany:
+    """GET_MANY"""
+
+    def test_alpha2(self, country: Country):
+        """should fetch many countries by alpha2 in input order"""
+        codes = ["US", "zz", country.alpha2, "CA"]
+        results = countries.get_many(alpha2=codes)
+
+        assert [r.alpha2 if r else None for r in results] == [
+            "US",
+            None,
+            country.alpha2,
+            "CA",
+        ]
+
+
 class TestFilter:
     """FILTER"""
 
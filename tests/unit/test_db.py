@@ -69,6 +69,37 @@ class TestConnection:
         db.connect()
         assert db._conn is not None
 
+    def test_attach_bundled(self, tmp_path):
+        """should attach the bundled db read-only next to an external db"""
+        external = Database(str(tmp_path / "external.db"))
+        try:
+            count = external.execute("SELECT COUNT(*) FROM countries").fetchone()[0]
+            assert count > 0
+
+            with pytest.raises(sqlite3.OperationalError):
+                external.execute("DELETE FROM countries")
+        finally:
+            external.close()
+
+    def test_extract_archive(self, tmp_path):
+        """should decompress a zipped db into a versioned cache dir once"""
+        import zipfile
+
+        source = tmp_path / Database.FILENAME
+        with sqlite3.connect(source) as conn:
+            conn.execute("CREATE TABLE t (a)")
+        archive = tmp_path / Database.ARCHIVE
+        with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            zf.write(source, arcname=Database.FILENAME)
+
+        target = Database.extract(archive, tmp_path / "cache")
+        mtime = target.stat().st_mtime_ns
+
+        assert target.read_bytes() == source.read_bytes()
+        assert Database.extract(archive, tmp_path / "cache") == target
+        assert target.stat().st_mtime_ns == mtime
+        assert list(target.parent.iterdir()) == [target]
+
     def test_atomic(self, db: Database, create_test_table):
         """should manage conn using 'with' syntax"""
         create_test_table()
@@ -94,6 +125,118 @@ class TestConnection:
         cursor = db.execute("SELECT COUNT(*) FROM test")
         assert cursor.fetchone()[0] == 0
 
+    def test_atomic_nested(self, db: Database, create_test_table):
+        """should roll back a nested block's changes with the outermost block"""
+        create_test_table()
+
+        with pytest.raises(ValueError):
+            with db.atomic():
+                with db.atomic():
+                    db.execute("INSERT INTO test (id) VALUES (1)")
+                raise ValueError("OPE")
+
+        cursor = db.execute("SELECT COUNT(*) FROM test")
+        assert cursor.fetchone()[0] == 0
+
+
+class TestBulkInsert:
+    """BULK INSERT"""
+
+    def test_bulk_insert(self, db: Database, create_test_table):
+        """should stream rows from a generator in batches and report metrics"""
+        create_test_table()
+        batches = []
+
+        metrics = db.bulk_insert(
+            "test",
+            ({"id": n} for n in range(25)),
+            batch_size=10,
+            progress=batches.append,
+        )
+
+        assert metrics.rows == 25
+        assert metrics.rows_per_second > 0
+        assert batches == [10, 20, 25]
+        assert db.execute("SELECT COUNT(*) FROM test").fetchone()[0] == 25
+
+    def test_empty(self, db: Database):
+        """should insert nothing for an empty iterable"""
+        assert db.bulk_insert("test", iter([])).rows == 0
+
+    def test_defer_merge(self, db: Database):
+        """should restore FTS automerge after a deferred load"""
+        CountryModel.drop()
+        db.create_tables([CountryModel])
+        rows = (
+            {"name": f"Country {n}", "alpha2": f"C{n}", "numeric": n} for n in range(50)
+        )
+
+        metrics = CountryModel.bulk_load(rows, batch_size=7, defer_merge=True)
+
+        config = dict(db.execute("SELECT k, v FROM countries_config").fetchall())
+        assert metrics.rows == CountryModel.count() == 50
+        assert config["automerge"] == CountryModel.FTS_AUTOMERGE
+        assert (
+            CountryModel.db.execute(
+                "SELECT COUNT(*) FROM countries WHERE countries MATCH 'country'"
+            ).fetchone()[0]
+            == 50
+        )
+
+
+class TestTracing:
+    """SQL TRACING"""
+
+    def test_normalize(self):
+        """should collapse literals and placeholder lists into one query shape"""
+        from localis.data.tracing import normalize_sql
+
+        shape = "SELECT admin1 FROM t WHERE a = ? AND b IN (?, ...) LIMIT ?"
+        assert (
+            normalize_sql(
+                "SELECT admin1 FROM t\n WHERE a = 'it''s' AND b IN (1, 2,3) LIMIT 10"
+            )
+            == shape
+        )
+        assert (
+            normalize_sql("SELECT admin1 FROM t WHERE a = ? AND b IN (?, ?) LIMIT 5")
+            == shape
+        )
+
+    def test_stats(self, db: Database, create_test_table):
+        """should count calls, time and rows per query shape while enabled"""
+        create_test_table()
+        tracer = db.enable_tracing()
+        try:
+            db.execute_many(
+                "INSERT INTO test (id) VALUES (?)", [(n,) for n in range(10)]
+            )
+            for limit in (3, 5):
+                db.execute(f"SELECT id FROM test LIMIT {limit}").fetchall()
+            rows = list(db.execute("SELECT id FROM test WHERE id > ?", (7,)))
+        finally:
+            db.disable_tracing()
+
+        stats = tracer.stats
+        assert len(tracer) == 3
+        assert stats["INSERT INTO test (id) VALUES (?)"]["rows"] == 10
+        assert stats["SELECT id FROM test LIMIT ?"]["count"] == 2
+        assert stats["SELECT id FROM test LIMIT ?"]["rows"] == 8
+        assert stats["SELECT id FROM test WHERE id > ?"]["rows"] == len(rows) == 2
+        assert db.tracer is None
+
+    def test_dump(self, db: Database, tmp_path):
+        """should dump the stats to a json file as queries run"""
+        import json
+
+        path = tmp_path / "trace.json"
+        db.enable_tracing(path, dump_interval=0)
+        try:
+            db.execute("SELECT 1").fetchone()
+            assert "SELECT ?" in json.loads(path.read_text())
+        finally:
+            db.disable_tracing()
+
 
 class TestMetaStore:
     """META"""
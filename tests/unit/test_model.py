@@ -90,3 +90,25 @@ class TestFTSMatch:
         """should return a matched list from truncated prefix"""
         results = CountryModel.fts_match(trunc(country.name), exact_match=False)
         assert country.name in [c.name for c in results]
+
+    def test_skips_unsearchable(self):
+        """should not match table-wide queries against unsearchable fields (geohash)"""
+        city = CityModel.select(limit=1)[0]
+        prefix = city.geohash[:3]
+        results = CityModel.fts_match(prefix, exact_match=False, limit=None)
+
+        searchable = ["name", "geonames_id", "admin1", "admin2", "country", "alt_names"]
+        assert all(
+            prefix in " ".join(getattr(r, f) or "" for f in searchable).lower()
+            for r in results
+        )
+
+    def test_match_filter(self):
+        """should AND the match_filter to a table-wide query"""
+        city = CityModel.select(limit=1)[0]
+        cell = city.geohash[:3]
+        results = CityModel.fts_match(
+            city.name, match_filter=CityModel.geohash.match_filter([cell])
+        )
+        assert city.id in [r.id for r in results]
+        assert all(r.geohash.startswith(cell) for r in results)
@@ -28,6 +28,110 @@ class TestGet:
         assert result is None
 
 
+@registry_param
+class TestGetMany:
+    """GET_MANY"""
+
+    def test_order(self, registry: Registry):
+        """should return results in input order with None for misses"""
+        ids = [3, -1, 1, 2]
+        results = registry.get_many(id=ids)
+
+        assert [r.id if r else None for r in results] == [3, None, 1, 2]
+
+    def test_duplicates(self, registry: Registry):
+        """should return the same object for repeated keys"""
+        results = registry.get_many(id=[2, 1, 2])
+
+        assert results[0] is results[2]
+        assert results[0] == registry.get(id=2)
+
+    def test_kwargs(self, registry: Registry):
+        """should return [] if given an invalid kwarg"""
+        results = registry.get_many(pid=[1])
+        assert results == []
+
+
+@registry_param
+class TestToColumns:
+    """TO_COLUMNS"""
+
+    def test_columns(self, registry: Registry):
+        """should return one full-length column per requested field"""
+        columns = registry.to_columns(["id", "name"])
+
+        assert list(columns) == ["id", "name"]
+        assert len(columns["id"]) == len(columns["name"]) == registry.count
+        assert columns["name"][0] == registry.get(id=columns["id"][0]).name
+        assert list(columns["id"]) == sorted(columns["id"])
+
+    def test_unknown_field(self, registry: Registry):
+        """should raise a ValueError for unknown fields"""
+        with pytest.raises(ValueError):
+            registry.to_columns(["pid"])
+
+    def test_numpy(self, registry: Registry):
+        """should return numpy arrays with the numpy backend"""
+        np = pytest.importorskip("numpy")
+        columns = registry.to_columns(["id"], backend="numpy")
+
+        assert isinstance(columns["id"], np.ndarray)
+        assert columns["id"].dtype == np.int64
+
+
+@registry_param
+class TestIdentityMap:
+    """IDENTITY MAP"""
+
+    @pytest.fixture(autouse=True)
+    def identity_map(self, registry: Registry):
+        yield registry.enable_identity_map()
+        registry.disable_identity_map()
+
+    def test_hit(self, registry: Registry):
+        """should return the already-built DTO on repeated hits"""
+        first = registry.get(id=1)
+        results = registry.filter(name=first.name)
+
+        assert registry.get(id=1) is first
+        assert first in results and any(r is first for r in results)
+        assert registry.identity_map.hits >= 2
+
+    def test_read_only(self, registry: Registry):
+        """should hand out read-only DTOs, so edits cannot leak into later lookups"""
+        from dataclasses import FrozenInstanceError, replace
+        from localis.dtos import thaw
+
+        dto = registry.get(id=1)
+        name = dto.name
+
+        with pytest.raises(FrozenInstanceError):
+            dto.name = "Zzyzx"
+        with pytest.raises(TypeError):
+            dto.alt_names.append("Zzyzx")
+        thaw(dto).name = replace(dto, name="Zzyzx").name
+
+        assert registry.get(id=1) is dto
+        assert dto.name == name and "Zzyzx" not in dto.alt_names
+
+    def test_bounded(self, registry: Registry):
+        """should evict the least recently used DTO beyond maxsize"""
+        registry.enable_identity_map(maxsize=2)
+        first = registry.get(id=1)
+        registry.get(id=2)
+        registry.get(id=3)
+
+        assert len(registry.identity_map) == 2
+        assert registry.get(id=1) is not first
+        assert registry.identity_map.stats["misses"] == 4
+
+    def test_disabled(self, registry: Registry):
+        """should build fresh DTOs when disabled"""
+        registry.disable_identity_map()
+
+        assert registry.get(id=1) is not registry.get(id=1)
+
+
 @registry_param
 class TestFilter:
     """FILTER"""
@@ -0,0 +1,180 @@
+import sys
+import pytest
+from array import array
+from localis.spatial import GridIndex, haversine
+
+
+class TestHaversine:
+    """HAVERSINE"""
+
+    def test_known_distance(self):
+        """should compute the great-circle distance in km (London -> Paris ~343km)"""
+        assert haversine(51.5074, -0.1278, 48.8566, 2.3522) == pytest.approx(
+            343.5, abs=1
+        )
+
+    def test_zero(self):
+        """should return 0 for identical points"""
+        assert haversine(10, 20, 10, 20) == 0
+
+
+class TestGridIndex:
+    """GRID INDEX"""
+
+    @pytest.fixture(scope="class")
+    def grid(self) -> GridIndex:
+        points = [(0, 179.9), (0, -179.9), (89.9, 0), (-45, 90), (10, 10)]
+        return GridIndex(
+            array("q", range(1, len(points) + 1)),
+            array("d", [p[0] for p in points]),
+            array("d", [p[1] for p in points]),
+            array("q", [10, 20, 30, 40, 50]),
+        )
+
+    def test_antimeridian(self, grid: GridIndex):
+        """should find neighbours across the antimeridian"""
+        results = grid.nearest(0, -179.95, k=2)
+        assert [id for id, _ in results] == [2, 1]
+
+    def test_pole(self, grid: GridIndex):
+        """should find neighbours near the poles"""
+        assert grid.nearest(89.99, 170)[0][0] == 3
+
+    def test_k_exceeds_points(self, grid: GridIndex):
+        """should return every point when k exceeds the number of points"""
+        assert len(grid.nearest(0, 0, k=10)) == len(grid)
+
+    def test_min_population(self, grid: GridIndex):
+        """should skip points below min_population"""
+        assert grid.nearest(10, 10, min_population=55) == []
+        assert grid.nearest(10, 10, min_population=45)[0][0] == 5
+
+    @pytest.mark.parametrize("cell_deg", [0, -1, 7.0, 200])
+    def test_invalid_cell_deg(self, cell_deg: float):
+        """should reject cell sizes that do not tile the globe exactly"""
+        with pytest.raises(ValueError):
+            GridIndex(array("q"), array("d"), array("d"), cell_deg=cell_deg)
+
+
+class TestVectorGridIndex:
+    """VECTOR GRID INDEX"""
+
+    @pytest.fixture(scope="class")
+    def points(self) -> tuple:
+        np = pytest.importorskip("numpy")
+        rng = np.random.default_rng(0)
+        lats = np.concatenate([rng.uniform(-90, 90, 500), rng.normal(48, 1, 500)])
+        lngs = np.concatenate([rng.uniform(-180, 180, 500), rng.normal(2, 1, 500)])
+        return np.arange(1, len(lats) + 1), lats, lngs
+
+    def test_brute_force(self, points: tuple):
+        """should match a brute-force scan for sparse, dense, polar and antimeridian points"""
+        np = pytest.importorskip("numpy")
+        from localis.spatial.vector_index import VectorGridIndex
+
+        ids, lats, lngs = points
+        index = VectorGridIndex(ids, lats, lngs)
+
+        rng = np.random.default_rng(1)
+        q_lats = np.concatenate([rng.uniform(-90, 90, 100), [90, -90, 0, 48.5]])
+        q_lngs = np.concatenate([rng.uniform(-180, 180, 100), [0, 0, 180, 2.5]])
+        result_ids, distances = index.nearest(q_lats, q_lngs)
+
+        for lat, lng, distance in zip(q_lats, q_lngs, distances):
+            expected = min(haversine(lat, lng, la, ln) for la, ln in zip(lats, lngs))
+            assert distance == pytest.approx(expected)
+        assert result_ids.dtype == np.int64
+
+        # coarse blocks wrapping the antimeridian
+        index = VectorGridIndex([1, 2], [0.0, 0.0], [-140.0, 120.0])
+        result_ids, distances = index.nearest([0.0], [175.0])
+        assert result_ids.tolist() == [1]
+        assert distances[0] == pytest.approx(haversine(0, 175, 0, -140))
+
+    def test_invalid_levels(self, points: tuple):
+        """should reject cell sizes that do not divide 360"""
+        from localis.spatial.vector_index import VectorGridIndex
+
+        with pytest.raises(ValueError):
+            VectorGridIndex(*points, levels=(0.5, 32.0))
+
+    def test_empty(self, points: tuple):
+        """should return empty arrays for no query points"""
+        from localis.spatial.vector_index import VectorGridIndex
+
+        ids, distances = VectorGridIndex(*points).nearest([], [])
+        assert len(ids) == len(distances) == 0
+
+
+class TestGeohash:
+    """GEOHASH"""
+
+    def test_encode(self):
+        """should encode known points"""
+        from localis.spatial import geohash
+
+        assert geohash.encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+        assert geohash.encode(37.7749, -122.4194, 5) == "9q8yy"
+
+    def test_decode(self):
+        """should decode to a cell containing the encoded point"""
+        from localis.spatial import geohash
+
+        min_lat, min_lng, max_lat, max_lng = geohash.decode("u4pruydqqvj")
+        assert min_lat <= 57.64911 <= max_lat and min_lng <= 10.40744 <= max_lng
+
+    def test_neighbors(self):
+        """should return the 8 surrounding cells, wrapping around the antimeridian"""
+        from localis.spatial import geohash
+
+        assert sorted(geohash.neighbors("u4pr")) == sorted(
+            ["u4r0", "u4r2", "u4r8", "u4pp", "u4px", "u4pn", "u4pq", "u4pw"]
+        )
+        assert "pb" in geohash.neighbors("00")
+
+
+class TestArrays:
+    """BULK ARRAYS"""
+
+    POINTS = [(51.5074, -0.1278), (48.8566, 2.3522), (0, 179.9), (-33.87, 151.21)]
+
+    @pytest.fixture(params=["numpy", "stdlib"])
+    def backend(self, request, monkeypatch):
+        if request.param == "numpy":
+            pytest.importorskip("numpy")
+        else:
+            monkeypatch.setitem(sys.modules, "numpy", None)
+        return request.param
+
+    def test_distance_matrix(self, backend):
+        """should compute every pairwise distance"""
+        from localis.spatial import distance_matrix
+
+        lats = [p[0] for p in self.POINTS]
+        lngs = [p[1] for p in self.POINTS]
+        matrix = distance_matrix(lats, lngs, lats[:2], lngs[:2])
+
+        assert len(matrix) == 4 and len(matrix[0]) == 2
+        for i, a in enumerate(self.POINTS):
+            for j, b in enumerate(self.POINTS[:2]):
+                assert matrix[i][j] == pytest.approx(haversine(*a, *b))
+
+    def test_bin_sum(self, backend):
+        """should sum weights per cell, keyed by the cell's south-west corner"""
+        from localis.spatial import bin_sum
+
+        bins = bin_sum(
+            [51.5, 51.9, 51.1, -33.9, 90],
+            [0.1, -0.9, -0.1, 151.2, 180],
+            [1, 2, 3, 4, 5],
+            1,
+        )
+
+        assert bins == {(51, 0): 1, (51, -1): 5, (-34, 151): 4, (89, -180): 5}
+
+    def test_bin_sum_invalid(self):
+        """should raise a ValueError for invalid cell sizes"""
+        from localis.spatial import bin_sum
+
+        with pytest.raises(ValueError):
+            bin_sum([0], [0], [1], 0)
@@ -25,6 +25,22 @@ class TestGet:
         assert getattr(result, field) == value
 
 
+class TestGetMany:
+    """GET_MANY"""
+
+    def test_iso_code(self):
+        """should fetch many subdivisions by iso_code in input order"""
+        codes = ["US-CA", "IN-UP", "XX-XX", "US-CA"]
+        results = subdivisions.get_many(iso_code=codes)
+
+        assert [r.iso_code if r else None for r in results] == [
+            "US-CA",
+            "IN-UP",
+            None,
+            "US-CA",
+        ]
+
+
 class TestFilter:
     """FILTER"""
 
@@ -138,3 +154,44 @@ class TestTypes:
         assert (
             set(results) == filtered_type_set
         ), f"expected the results to match the set of types from filtered subdivisions"
+
+
+class TestTree:
+    """TREE NAVIGATION"""
+
+    def test_children(self):
+        """should return the direct children of a subdivision"""
+
+        parent = subdivisions.get(iso_code="US-CA")
+        results = subdivisions.children(iso_code="US-CA")
+
+        assert len(results) > 0, "expected at least one child"
+        assert all(r.parent_id == parent.id for r in results)
+
+    def test_descendants(self):
+        """should return every subdivision below a subdivision"""
+
+        children = subdivisions.children(iso_code="US-CA")
+        results = subdivisions.descendants(iso_code="US-CA")
+
+        assert all(c in results for c in children)
+
+    def test_ancestors(self, sub: Subdivision, select_random):
+        """should return the parents of a subdivision, nearest first"""
+
+        i = 1
+        while sub.parent_id is None:
+            sub = select_random(subdivisions, i)
+            i += 1
+
+        results = subdivisions.ancestors(id=sub.id)
+
+        assert len(results) > 0, "expected at least one ancestor"
+        assert results[0].id == sub.parent_id
+
+    @pytest.mark.parametrize("method", ["children", "descendants", "ancestors"])
+    def test_empty(self, method: str):
+        """should return [] for invalid inputs"""
+
+        results = getattr(subdivisions, method)(iso_code="abcbbd")
+        assert results == []